@@ -1,9 +1,75 @@
 from django.contrib import admin
-from .models import Lead
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .models import ArchivedLead, ConversationEvent, Lead, PricingProfile, ProfilerSettings, RequestProfile
 
 @admin.register(Lead)
 class LeadAdmin(admin.ModelAdmin):
     list_display = ('email', 'business_type', 'calculated_annual_leak', 'lead_score_tag', 'created_at')
-    list_filter = ('business_type', 'lead_score_tag', 'created_at')
+    list_filter = ('business_type', 'lead_score_tag', 'email_unverified', 'email_undeliverable', 'created_at')
     search_fields = ('email', 'business_type')
     readonly_fields = ('created_at',)
+
+
+@admin.register(ArchivedLead)
+class ArchivedLeadAdmin(admin.ModelAdmin):
+    list_display = ('email', 'business_type', 'is_completed', 'created_at', 'archived_at')
+    list_filter = ('is_completed', 'business_type', 'created_at')
+    search_fields = ('email', 'business_type')
+    readonly_fields = ('original_id', 'created_at', 'archived_at')
+
+
+@admin.register(ProfilerSettings)
+class ProfilerSettingsAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'enabled', 'sample_rate', 'updated_at')
+
+    def has_add_permission(self, request):
+        # Singleton: the middleware only reads the first row.
+        return not ProfilerSettings.objects.exists()
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ('endpoint', 'state', 'method', 'status_code', 'duration_ms', 'sample_count', 'trigger', 'created_at', 'download_link')
+    list_filter = ('endpoint', 'state', 'trigger', 'created_at')
+    exclude = ('folded_stacks',)
+    readonly_fields = ('endpoint', 'state', 'method', 'status_code', 'duration_ms', 'sample_count', 'trigger', 'created_at', 'download_link')
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        return [
+            path('<int:profile_id>/download/', self.admin_site.admin_view(self.download_view),
+                 name='advisor_requestprofile_download'),
+        ] + super().get_urls()
+
+    @admin.display(description='Folded stacks')
+    def download_link(self, obj):
+        url = reverse('admin:advisor_requestprofile_download', args=[obj.id])
+        return format_html('<a href="{}">Download</a>', url)
+
+    def download_view(self, request, profile_id):
+        profile = get_object_or_404(RequestProfile, id=profile_id)
+        endpoint = profile.endpoint.strip('/').replace('/', '_') or 'root'
+        filename = f"profile-{profile.id}-{endpoint}-{profile.state or 'none'}.folded"
+        response = HttpResponse(profile.folded_stacks, content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+@admin.register(ConversationEvent)
+class ConversationEventAdmin(admin.ModelAdmin):
+    list_display = ('session_id', 'lead_id', 'state', 'next_state', 'valid', 'latency_ms', 'created_at')
+    list_filter = ('state', 'valid', 'created_at')
+    search_fields = ('session_id', 'lead_id')
+
+
+@admin.register(PricingProfile)
+class PricingProfileAdmin(admin.ModelAdmin):
+    list_display = ('name', 'country_code', 'business_type', 'applova_commission_rate', 'ltv_uplift_factor', 'recovery_efficiency', 'version', 'is_active', 'updated_at')
+    list_filter = ('is_active', 'country_code', 'business_type')
+    readonly_fields = ('version', 'updated_at')
@@ -0,0 +1,151 @@
+from .mail_domains import POPULAR_MAIL_DOMAINS
+
+# Names shorter than this are neither corrected nor used as correction targets:
+# at that length almost every string is one edit away from a real company
+# domain (gmc.com vs gmx.com).
+MIN_NAME_LENGTH = 4
+MAX_DISTANCE = 2
+# Names up to this length only get corrected for the slips in is_likely_slip
+# and keep their TLD: a substituted or extra letter in a short name is just as
+# likely another real domain (love.com, cloud.com, tree.com).
+SHORT_NAME_LENGTH = 5
+
+# Top-level domains that are almost always a mistyped ".com" / ".net" / ".org".
+TLD_TYPOS = {
+    'con', 'cpm', 'cm', 'om', 'cim', 'vom', 'xom', 'comm', 'coom', 'cmo', 'ocm', 'co', 'c',
+    'nte', 'ner', 'nt', 'orf', 'ogr',
+}
+
+
+def split_domain(domain):
+    """``'yahoo.co.uk'`` -> ``('yahoo', 'co.uk')``"""
+    name, _, suffix = domain.partition('.')
+    return name, suffix
+
+
+def osa_distance(a, b):
+    """Optimal string alignment distance: Levenshtein plus adjacent transpositions."""
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def is_likely_slip(typed, intended):
+    """
+    True for the slips a short name is trusted with: two neighbouring letters
+    swapped (gmial), a repeated letter doubled or dropped (gmaill, yaho) or the
+    last letter dropped (gmai).
+    """
+    if len(typed) == len(intended):
+        diffs = [i for i in range(len(typed)) if typed[i] != intended[i]]
+        return (len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                and typed[diffs[0]] == intended[diffs[1]] and typed[diffs[1]] == intended[diffs[0]])
+    if abs(len(typed) - len(intended)) != 1:
+        return False
+    longer, shorter = (typed, intended) if len(typed) > len(intended) else (intended, typed)
+    for i in range(len(longer)):
+        if longer[:i] + longer[i + 1:] != shorter:
+            continue
+        if longer is intended and i == len(longer) - 1:
+            return True
+        if longer[i] in longer[max(i - 1, 0):i] + longer[i + 1:i + 2]:
+            return True
+    return False
+
+
+def deletes(word, max_distance):
+    """Every string obtained by deleting up to ``max_distance`` characters."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+class DomainTypoIndex:
+    """
+    Suggests the intended popular mail domain for a mistyped one.
+
+    Uses a deletion-neighbourhood (SymSpell) index over the domain names, so a
+    lookup is a few dozen dict probes plus distance checks on the handful of
+    candidates that share a deletion variant; no DNS is involved.
+    """
+
+    def __init__(self, domains=POPULAR_MAIL_DOMAINS, max_distance=MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.known = frozenset(domains)
+        self.rank = {}
+        self.default_domain = {}
+        self.index = {}
+        self.longest_name = 0
+        for rank, domain in enumerate(domains):
+            name, _ = split_domain(domain)
+            self.default_domain.setdefault(name, domain)
+            if name in self.rank:
+                continue
+            self.rank[name] = rank
+            if len(name) >= MIN_NAME_LENGTH:
+                self.longest_name = max(self.longest_name, len(name))
+                for variant in deletes(name, max_distance):
+                    self.index.setdefault(variant, set()).add(name)
+
+    def correct_name(self, name):
+        if name in self.rank:
+            return name
+        max_distance = 1 if len(name) <= SHORT_NAME_LENGTH else self.max_distance
+        # Too short to correct safely, or too long to be near any target.
+        if len(name) < MIN_NAME_LENGTH or len(name) > self.longest_name + max_distance:
+            return None
+        candidates = set()
+        for variant in deletes(name, max_distance):
+            candidates.update(self.index.get(variant, ()))
+        best = None
+        for candidate in candidates:
+            if len(name) <= SHORT_NAME_LENGTH and not is_likely_slip(name, candidate):
+                continue
+            distance = osa_distance(name, candidate)
+            if distance <= max_distance:
+                key = (distance, self.rank[candidate])
+                if best is None or key < best[0]:
+                    best = (key, candidate)
+        return best[1] if best else None
+
+    def suggest(self, domain):
+        """Return the likely intended domain, or None if ``domain`` doesn't look like a typo."""
+        domain = domain.lower()
+        if domain in self.known:
+            return None
+        name, suffix = split_domain(domain)
+        if not suffix:
+            return None
+
+        corrected = self.correct_name(name)
+        if corrected is None:
+            return None
+        if f"{corrected}.{suffix}" in self.known:
+            # yaho.co.uk -> yahoo.co.uk
+            return f"{corrected}.{suffix}"
+        if len(name) <= SHORT_NAME_LENGTH and suffix not in TLD_TYPOS:
+            # shah.com is not shaw.ca
+            return None
+        if corrected != name or suffix in TLD_TYPOS:
+            # gmial.com -> gmail.com, gmail.con -> gmail.com. A known name on a
+            # plausible other TLD (hotmail.es) is left alone.
+            return self.default_domain[corrected]
+        return None
+
+
+index = DomainTypoIndex()
+
+
+def suggest_domain(domain):
+    return index.suggest(domain)
@@ -0,0 +1,148 @@
+import atexit
+import json
+import os
+import re
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .state_machine import StateMachine
+
+# States whose answers are personal data and never recorded.
+PII_STATES = {'email'}
+
+SESSION_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+MAX_LEAD_ID = 2 ** 63 - 1
+MAX_ANSWER_LENGTH = 200
+MAX_ANSWER_ITEMS = 20
+# Failed writes are retried with the next flush, up to this many batches.
+MAX_PENDING_BATCHES = 10
+
+
+def is_session_id(value):
+    """True for the uuid4().hex ids ChatView hands out."""
+    return isinstance(value, str) and SESSION_ID_PATTERN.fullmatch(value) is not None
+
+
+def clean_answer(answer):
+    """
+    Answers are client JSON. Keep numbers, short strings and short lists of
+    strings (the multi-select apps step); anything else is not a chat answer.
+    """
+    if answer is None or isinstance(answer, (bool, int, float)):
+        return answer
+    if isinstance(answer, str):
+        return answer[:MAX_ANSWER_LENGTH]
+    if isinstance(answer, list) and len(answer) <= MAX_ANSWER_ITEMS and all(isinstance(item, str) for item in answer):
+        return [item[:MAX_ANSWER_LENGTH] for item in answer]
+    return None
+
+
+class EventBuffer:
+    """
+    In-memory buffer of conversation events, written in batches.
+
+    ``record`` only appends under a lock; writes happen on a daemon thread,
+    woken when the buffer reaches ``EVENT_LOG_BATCH_SIZE`` events and otherwise
+    every ``EVENT_LOG_FLUSH_INTERVAL`` seconds, plus once at interpreter exit.
+    The sink is either the ``ConversationEvent`` table (``bulk_create``) or an
+    append-only JSON Lines file. A failed write is put back and retried with
+    the next flush (up to ``MAX_PENDING_BATCHES`` batches); events still
+    buffered when a worker is killed are lost.
+    """
+
+    def __init__(self):
+        self._events = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher = None
+
+    def _ensure_flusher(self):
+        # Started lazily so each gunicorn worker gets its own after fork.
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._run, name='event-log-flusher', daemon=True)
+            self._flusher.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(settings.EVENT_LOG_FLUSH_INTERVAL)
+            self._wake.clear()
+            # This thread's connection sees no request signals: drop it if it
+            # went stale (MySQL wait_timeout, failover) so the write reconnects.
+            close_old_connections()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def record(self, **event):
+        if settings.EVENT_LOG_SINK == 'off':
+            return
+        event.setdefault('created_at', timezone.now())
+        with self._lock:
+            self._ensure_flusher()
+            self._events.append(event)
+            full = len(self._events) >= settings.EVENT_LOG_BATCH_SIZE
+        if full:
+            # The chat request that fills the buffer doesn't pay for the insert.
+            self._wake.set()
+
+    def flush(self):
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return 0
+        try:
+            with self._write_lock:
+                if settings.EVENT_LOG_SINK == 'file':
+                    self._write_file(events)
+                else:
+                    self._write_db(events)
+        except Exception as e:
+            print(f"Error writing {len(events)} conversation events: {e}")
+            with self._lock:
+                limit = settings.EVENT_LOG_BATCH_SIZE * MAX_PENDING_BATCHES
+                self._events = (events + self._events)[-limit:]
+            return 0
+        return len(events)
+
+    @staticmethod
+    def _write_db(events):
+        from .models import ConversationEvent
+        ConversationEvent.objects.bulk_create([ConversationEvent(**event) for event in events])
+
+    @staticmethod
+    def _write_file(events):
+        os.makedirs(os.path.dirname(settings.EVENT_LOG_PATH), exist_ok=True)
+        lines = ''.join(
+            json.dumps(dict(event, created_at=event['created_at'].isoformat())) + '\n'
+            for event in events
+        )
+        with open(settings.EVENT_LOG_PATH, 'a') as f:
+            f.write(lines)
+
+
+buffer = EventBuffer()
+atexit.register(buffer.flush)
+
+
+def record_turn(session_id, lead_id, state, next_state, valid, latency_ms, answer):
+    # session_id, lead_id, state and answer come from the client. One value
+    # that doesn't fit its column would fail the whole batch insert, so
+    # anything unexpected is dropped here.
+    if not is_session_id(session_id) or state not in StateMachine.STATES:
+        return
+    if not isinstance(lead_id, int) or isinstance(lead_id, bool) or not 0 < lead_id <= MAX_LEAD_ID:
+        lead_id = None
+    buffer.record(
+        session_id=session_id,
+        lead_id=lead_id,
+        state=state,
+        next_state=next_state,
+        valid=valid,
+        latency_ms=latency_ms,
+        answer=None if state in PII_STATES else clean_answer(answer),
+    )
@@ -6,7 +6,25 @@ LTV_UPLIFT_FACTOR = 0.4      # 40% Uplift factor for owning customer data
 ANNUAL_MONTHS = 12
 RECOVERY_EFFICIENCY = 0.95   # 95% efficiency in avoiding direct costs
 
-def calculate_profit_gain(aov, orders, commission_rate_tpd, monthly_fixed_fee_tpd):
+def pricing_rates(profile=None):
+    """
+    The rates calculate_profit_gain uses for ``profile`` (the module constants when None).
+
+    Stored with each scored lead, since a profile's rates can change later.
+    """
+    if profile is None:
+        return {
+            "applova_commission_rate": APPLOVA_COMMISSION_RATE,
+            "ltv_uplift_factor": LTV_UPLIFT_FACTOR,
+            "recovery_efficiency": RECOVERY_EFFICIENCY,
+        }
+    return {
+        "applova_commission_rate": profile.applova_commission_rate,
+        "ltv_uplift_factor": profile.ltv_uplift_factor,
+        "recovery_efficiency": profile.recovery_efficiency,
+    }
+
+def calculate_profit_gain(aov, orders, commission_rate_tpd, monthly_fixed_fee_tpd, profile=None):
     """
     Calculate the annual profit gain potential by switching from high TPD commission
     to a direct platform with an effective 10% fee.
@@ -16,10 +34,17 @@ def calculate_profit_gain(aov, orders, commission_rate_tpd, monthly_fixed_fee_tp
         orders (int): Monthly orders.
         commission_rate_tpd (float): TPD commission rate in percentage (e.g., 30 for 30%).
         monthly_fixed_fee_tpd (float): Monthly fixed platform fees paid to TPD.
+        profile (PricingProfile, optional): Market-specific rates overriding the
+            module constants (see advisor/pricing.py).
 
     Returns:
         dict: A dictionary containing the calculated financial gain metrics.
     """
+    rates = pricing_rates(profile)
+    applova_commission_rate = rates["applova_commission_rate"]
+    ltv_uplift_factor = rates["ltv_uplift_factor"]
+    recovery_efficiency = rates["recovery_efficiency"]
+
     # Ensure inputs are valid numbers
     aov = float(aov)
     orders = int(orders)
@@ -34,7 +59,7 @@ def calculate_profit_gain(aov, orders, commission_rate_tpd, monthly_fixed_fee_tp
     
     # 2. Commission & Fee Savings (New Core Calculation)
     # The savings is the difference between the TPD rate and the Applova rate (10%) applied to the annual revenue.
-    commission_savings = (tpd_commission_decimal - APPLOVA_COMMISSION_RATE) * annual_revenue
+    commission_savings = (tpd_commission_decimal - applova_commission_rate) * annual_revenue
 
     # 3. Fixed Fee Savings (Annualized)
     # The assumption is that these fixed TPD fees are entirely avoided.
@@ -42,14 +67,14 @@ def calculate_profit_gain(aov, orders, commission_rate_tpd, monthly_fixed_fee_tp
     
     # 4. Lost Customer Data Value (LCLV) Gain (Unchanged)
     # This is now framed as a "gain" because the data is recovered.
-    lclv_gain = annual_revenue * LTV_UPLIFT_FACTOR
+    lclv_gain = annual_revenue * ltv_uplift_factor
 
     # Total Direct Cost Savings (The money recovered from commissions and fixed fees)
     total_avoidable_costs = commission_savings + fixed_fee_savings
     
     # Estimated Profit Recovery (The Value Proposition)
     # We apply the 95% efficiency to the avoidable costs, plus 100% of the LCLV gain.
-    estimated_recovery_amount = (total_avoidable_costs * RECOVERY_EFFICIENCY) + lclv_gain
+    estimated_recovery_amount = (total_avoidable_costs * recovery_efficiency) + lclv_gain
 
     return {
         "annual_revenue_base": annual_revenue,
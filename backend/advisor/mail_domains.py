@@ -0,0 +1,15 @@
+# Widely used consumer and small-business mail domains, most popular first. Used to
+# pre-resolve DNS verdicts at warm-up and as the target set for typo suggestions
+# (advisor/domain_typos.py), where the first domain for a name is the default.
+POPULAR_MAIL_DOMAINS = (
+    'gmail.com', 'googlemail.com', 'yahoo.com', 'ymail.com', 'hotmail.com',
+    'outlook.com', 'live.com', 'msn.com', 'icloud.com', 'me.com', 'mac.com',
+    'aol.com', 'proton.me', 'protonmail.com', 'gmx.com', 'gmx.net', 'mail.com',
+    'zoho.com', 'yandex.com', 'comcast.net', 'verizon.net', 'att.net',
+    'sbcglobal.net', 'bellsouth.net', 'cox.net', 'charter.net', 'earthlink.net',
+    'yahoo.co.uk', 'hotmail.co.uk', 'btinternet.com', 'sky.com', 'virginmedia.com',
+    'yahoo.ca', 'rogers.com', 'shaw.ca', 'bigpond.com', 'optusnet.com.au',
+    'yahoo.com.au', 'yahoo.co.in', 'rediffmail.com', 'gmx.de', 'web.de',
+    'hotmail.fr', 'orange.fr', 'free.fr', 'libero.it', 'qq.com', '163.com',
+    'email.com', 'inbox.com', 'mail.ru', 'hotmail.it', 'outlook.fr', 'live.co.uk',
+)
@@ -0,0 +1,198 @@
+import json
+import os
+import shutil
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from advisor.models import Lead
+from advisor.state_machine import StateMachine
+from core.db_router import use_replica
+
+# Exported columns. Email and IP address are left out on purpose: analysts slice
+# by business attributes, and the snapshot leaves the database's access control.
+SCALAR_COLUMNS = [
+    'id', 'created_at', 'updated_at', 'lead_source', 'business_type', 'aov',
+    'monthly_orders', 'commission_rate', 'monthly_fixed_fee', 'calculated_annual_leak',
+    'estimated_recovery', 'lead_score_tag', 'city', 'region', 'country', 'country_code',
+    'is_completed', 'consultation_requested',
+]
+
+APP_OPTIONS = StateMachine.STATES['third_party_apps']['options']
+
+
+def app_column(app):
+    return 'uses_' + app.lower().replace(' ', '_')
+
+
+class Command(BaseCommand):
+    help = (
+        "Incrementally export Lead rows to Parquet files partitioned by creation month "
+        "(<dir>/leads/month=YYYY-MM/part-*.parquet). Only rows updated since the last "
+        "watermark are appended, so a lead that changed after an earlier export appears "
+        "again; readers should keep the row with the latest updated_at per id. "
+        "Requires pyarrow."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default=settings.ANALYTICS_EXPORT_DIR)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--full', action='store_true',
+                            help="Ignore the watermark and rebuild the whole leads/ dataset from scratch.")
+
+    def handle(self, *args, **options):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise CommandError("pyarrow is required: pip install pyarrow")
+
+        final_root = os.path.join(options['output_dir'], 'leads')
+        # Part files are never overwritten: two runs in the same second (or a
+        # reused pid) must not share a name.
+        run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        if options['full']:
+            # Build the new dataset next to the old one and swap it in at the
+            # end, instead of adding a second copy of every lead to it.
+            root = os.path.join(options['output_dir'], f".leads-full-{run_id}")
+            watermark = None
+        else:
+            root = final_root
+            watermark = self.read_watermark(os.path.join(root, '_watermark.json'))
+        watermark_path = os.path.join(root, '_watermark.json')
+
+        schema = self.schema(pa)
+        writers = {}
+        exported = 0
+        last = None
+
+        queryset = Lead.objects.order_by('updated_at', 'id')
+        if watermark:
+            since, since_id = watermark
+            queryset = queryset.filter(Q(updated_at__gt=since) | Q(updated_at=since, id__gt=since_id))
+
+        # Analytical scans read from the replica when one is configured.
+        completed = False
+        with use_replica():
+            try:
+                batch = []
+                for row in queryset.values(*SCALAR_COLUMNS, 'third_party_apps').iterator(chunk_size=options['batch_size']):
+                    batch.append(row)
+                    if len(batch) >= options['batch_size']:
+                        self.write_batch(pa, pq, schema, root, run_id, writers, batch)
+                        exported += len(batch)
+                        last = batch[-1]
+                        batch = []
+                if batch:
+                    self.write_batch(pa, pq, schema, root, run_id, writers, batch)
+                    exported += len(batch)
+                    last = batch[-1]
+                completed = True
+            finally:
+                for writer in writers.values():
+                    writer.close()
+                if options['full'] and not completed:
+                    shutil.rmtree(root, ignore_errors=True)
+
+        # Advance the watermark only once every part file is complete.
+        if last is not None:
+            self.write_watermark(watermark_path, last['updated_at'], last['id'])
+        if options['full']:
+            self.swap_in(root, final_root)
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {exported} lead(s) into {len(writers)} month partition(s) under {final_root}"
+        ))
+
+    @staticmethod
+    def swap_in(new_root, final_root):
+        os.makedirs(new_root, exist_ok=True)
+        old_root = f"{new_root}.old"
+        if os.path.exists(final_root):
+            os.replace(final_root, old_root)
+        os.replace(new_root, final_root)
+        shutil.rmtree(old_root, ignore_errors=True)
+
+    @staticmethod
+    def schema(pa):
+        timestamp = pa.timestamp('us', tz='UTC')
+        fields = [
+            ('id', pa.int64()),
+            ('created_at', timestamp),
+            ('updated_at', timestamp),
+            ('lead_source', pa.dictionary(pa.int32(), pa.string())),
+            ('business_type', pa.dictionary(pa.int32(), pa.string())),
+            ('aov', pa.float64()),
+            ('monthly_orders', pa.int64()),
+            ('commission_rate', pa.float64()),
+            ('monthly_fixed_fee', pa.float64()),
+            ('calculated_annual_leak', pa.float64()),
+            ('estimated_recovery', pa.float64()),
+            ('lead_score_tag', pa.dictionary(pa.int32(), pa.string())),
+            ('city', pa.string()),
+            ('region', pa.string()),
+            ('country', pa.dictionary(pa.int32(), pa.string())),
+            ('country_code', pa.dictionary(pa.int32(), pa.string())),
+            ('is_completed', pa.bool_()),
+            ('consultation_requested', pa.bool_()),
+            ('third_party_apps', pa.list_(pa.string())),
+            ('third_party_app_count', pa.int32()),
+        ]
+        fields += [(app_column(app), pa.bool_()) for app in APP_OPTIONS]
+        return pa.schema(fields)
+
+    def write_batch(self, pa, pq, schema, root, run_id, writers, rows):
+        by_month = defaultdict(list)
+        for row in rows:
+            by_month[row['created_at'].strftime('%Y-%m')].append(row)
+
+        for month, month_rows in by_month.items():
+            columns = {name: [row[name] for row in month_rows] for name in SCALAR_COLUMNS}
+            apps = [self.normalize_apps(row['third_party_apps']) for row in month_rows]
+            columns['third_party_apps'] = apps
+            columns['third_party_app_count'] = [len(row_apps) for row_apps in apps]
+            for app in APP_OPTIONS:
+                columns[app_column(app)] = [app in row_apps for row_apps in apps]
+
+            table = pa.table(columns, schema=schema)
+            writer = writers.get(month)
+            if writer is None:
+                partition = os.path.join(root, f"month={month}")
+                os.makedirs(partition, exist_ok=True)
+                writer = pq.ParquetWriter(
+                    os.path.join(partition, f"part-{run_id}.parquet"), schema, compression='zstd'
+                )
+                writers[month] = writer
+            writer.write_table(table)
+
+    @staticmethod
+    def normalize_apps(value):
+        # The JSON field is normally a list of option names, but early rows may
+        # hold a single string or null.
+        if not value:
+            return []
+        if isinstance(value, str):
+            return [value]
+        return [str(app) for app in value]
+
+    @staticmethod
+    def read_watermark(path):
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            watermark = json.load(f)
+        return datetime.fromisoformat(watermark['updated_at']), watermark['id']
+
+    @staticmethod
+    def write_watermark(path, updated_at, lead_id):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'updated_at': updated_at.astimezone(dt_timezone.utc).isoformat(),
+                'id': lead_id,
+            }, f)
+        os.replace(tmp_path, path)
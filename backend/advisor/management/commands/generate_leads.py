@@ -0,0 +1,255 @@
+import json
+import multiprocessing
+import operator
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand
+from django.db import connections, router, transaction
+
+from advisor.logic import calculate_profit_gain, get_lead_score
+from advisor.models import Lead
+
+SYNTHETIC_LEAD_SOURCE = "Synthetic_ScaleTest"
+
+# (weight, median AOV) per restaurant type.
+BUSINESS_TYPES = {
+    "QSR": (0.40, 22.0),
+    "Fast Casual": (0.30, 31.0),
+    "Full Service": (0.20, 55.0),
+    "Other": (0.10, 35.0),
+}
+
+# Probability that a restaurant uses each app (at least one is always picked).
+APP_USAGE = {"DoorDash": 0.75, "Uber Eats": 0.60, "Grubhub": 0.30, "Other": 0.10}
+
+# (weight, country, country code, cities)
+COUNTRIES = [
+    (0.70, "United States", "US", ["New York", "Los Angeles", "Chicago", "Houston", "Phoenix", "Austin"]),
+    (0.08, "Canada", "CA", ["Toronto", "Vancouver", "Montreal"]),
+    (0.07, "United Kingdom", "GB", ["London", "Manchester", "Birmingham"]),
+    (0.05, "Australia", "AU", ["Sydney", "Melbourne", "Brisbane"]),
+    (0.04, "India", "IN", ["Bengaluru", "Mumbai", "Delhi"]),
+    (0.03, "Sri Lanka", "LK", ["Colombo", "Kandy"]),
+    (0.03, None, None, [None]),  # location lookup failed
+]
+
+# Chat steps in order, with the share of abandoned conversations that stop
+# after answering each of them (mirrors the StateMachine flow).
+ABANDON_AFTER = [
+    ("business_type", 0.30),
+    ("aov", 0.20),
+    ("orders", 0.15),
+    ("commission", 0.12),
+    ("fixed_fees", 0.10),
+    ("third_party_apps", 0.13),
+]
+
+
+LEAD_COLUMNS = [field for field in Lead._meta.concrete_fields if not field.primary_key]
+
+
+@contextmanager
+def explicit_timestamps():
+    """Let bulk_create keep the created_at/updated_at values we assign."""
+    fields = [Lead._meta.get_field('created_at'), Lead._meta.get_field('updated_at')]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class LeadFactory:
+    def __init__(self, end, days, completed_ratio, rng=None):
+        self.rng = rng
+        self.end = end
+        self.span_seconds = days * 86400
+        self.completed_ratio = completed_ratio
+        self.business_types = list(BUSINESS_TYPES)
+        self.business_weights = [weight for weight, _ in BUSINESS_TYPES.values()]
+        self.country_weights = [country[0] for country in COUNTRIES]
+        self.abandon_steps = [step for step, _ in ABANDON_AFTER]
+        self.abandon_weights = [weight for _, weight in ABANDON_AFTER]
+        # Model defaults for the columns build() doesn't set (raw inserts skip them).
+        self.defaults = {field.attname: field.get_default() for field in LEAD_COLUMNS}
+
+    def build(self, number):
+        """One lead as ``{column: value}`` for every column in LEAD_COLUMNS."""
+        rng = self.rng
+        created_at = self.end - timedelta(seconds=rng.random() * self.span_seconds)
+        _, country, country_code, cities = rng.choices(COUNTRIES, self.country_weights)[0]
+
+        business_type = rng.choices(self.business_types, self.business_weights)[0]
+        answers = {
+            "business_type": business_type,
+            "aov": round(rng.lognormvariate(0, 0.35) * BUSINESS_TYPES[business_type][1], 2),
+            "orders": max(10, min(20000, int(rng.lognormvariate(6.0, 0.8)))),
+            "commission": round(max(10.0, min(35.0, rng.gauss(25.0, 4.0))), 1),
+            "fixed_fees": 0.0 if rng.random() < 0.4 else round(rng.lognormvariate(4.5, 0.6), 2),
+            "third_party_apps": [app for app, p in APP_USAGE.items() if rng.random() < p] or ["DoorDash"],
+        }
+
+        completed = rng.random() < self.completed_ratio
+        if completed:
+            answered = self.abandon_steps
+        else:
+            last = rng.choices(self.abandon_steps, self.abandon_weights)[0]
+            answered = self.abandon_steps[:self.abandon_steps.index(last) + 1]
+
+        lead = dict(
+            self.defaults,
+            lead_source=SYNTHETIC_LEAD_SOURCE,
+            business_type=answers["business_type"],
+            aov=answers["aov"] if "aov" in answered else None,
+            monthly_orders=answers["orders"] if "orders" in answered else None,
+            commission_rate=answers["commission"] if "commission" in answered else None,
+            monthly_fixed_fee=answers["fixed_fees"] if "fixed_fees" in answered else None,
+            third_party_apps=answers["third_party_apps"] if "third_party_apps" in answered else None,
+            email='',
+            country=country,
+            country_code=country_code,
+            city=rng.choice(cities),
+            is_completed=completed,
+            created_at=created_at,
+            updated_at=created_at + timedelta(seconds=rng.randint(5, 300)),
+        )
+
+        if completed:
+            metrics = calculate_profit_gain(
+                answers["aov"], answers["orders"], answers["commission"], answers["fixed_fees"]
+            )
+            lead["email"] = f"lead{number}@example.com"
+            # Same "total leak equivalent" as StateMachine.process_input.
+            lead["calculated_annual_leak"] = (
+                metrics["commission_fee_savings"] + metrics["fixed_fee_savings"] + metrics["lclv_gain"]
+            )
+            lead["estimated_recovery"] = metrics["total_profit_gain_potential"]
+            lead["lead_score_tag"] = get_lead_score(metrics["total_profit_gain_potential"])
+            lead["consultation_requested"] = rng.random() < 0.12
+        return lead
+
+
+def generate_chunk(job):
+    """
+    Insert one chunk of leads in its own transaction.
+
+    Each chunk has its own RNG seeded from ``(seed, chunk index)``, so the output
+    is the same whether chunks run in one process or across several workers.
+    """
+    factory, seed, index, start, size, batch_size = job
+    factory.rng = random.Random(f"{seed}:{index}")
+    # Build the rows before opening the transaction so it only covers the inserts.
+    leads = [factory.build(start + i) for i in range(size)]
+    connection = connections[router.db_for_write(Lead)]
+    if connection.vendor == 'sqlite':
+        insert_sqlite(connection, leads, batch_size)
+    else:
+        with explicit_timestamps(), transaction.atomic(using=connection.alias):
+            Lead.objects.using(connection.alias).bulk_create(
+                [Lead(**lead) for lead in leads], batch_size=batch_size
+            )
+    return size
+
+
+def insert_sqlite(connection, leads, batch_size):
+    """
+    Insert with one prepared statement per batch.
+
+    bulk_create runs every value through the field's get_db_prep_save and, to
+    stay under SQLite's bound-variable limit, splits a batch into INSERTs of a
+    few dozen rows; both dominate the run time at millions of rows. The values
+    here are plain Python, so only datetimes and JSON need adapting.
+    """
+    ops = connection.ops
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        ops.quote_name(Lead._meta.db_table),
+        ', '.join(ops.quote_name(field.column) for field in LEAD_COLUMNS),
+        ', '.join(['%s'] * len(LEAD_COLUMNS)),
+    )
+    adapters = {'JSONField': json.dumps, 'DateTimeField': ops.adapt_datetimefield_value}
+    adapted = [
+        (position, adapters[field.get_internal_type()])
+        for position, field in enumerate(LEAD_COLUMNS)
+        if field.get_internal_type() in adapters
+    ]
+
+    values = operator.itemgetter(*[field.attname for field in LEAD_COLUMNS])
+    rows = []
+    for lead in leads:
+        row = list(values(lead))
+        for position, adapt in adapted:
+            if row[position] is not None:
+                row[position] = adapt(row[position])
+        rows.append(row)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for offset in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[offset:offset + batch_size])
+
+
+def init_worker():
+    connections.close_all()
+    for connection in connections.all():
+        if connection.vendor == 'sqlite':
+            # SQLite allows one writer at a time; wait for the lock instead of failing.
+            connection.settings_dict.setdefault('OPTIONS', {})['timeout'] = 600
+
+
+class Command(BaseCommand):
+    help = (
+        f"Generate realistic synthetic leads (lead_source={SYNTHETIC_LEAD_SOURCE}) for scale testing. "
+        "Output is deterministic for a given --seed, --end-date and --batch-size/--batches-per-transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per INSERT batch.")
+        parser.add_argument('--batches-per-transaction', type=int, default=10)
+        parser.add_argument('--completed-ratio', type=float, default=0.35)
+        parser.add_argument('--days', type=int, default=365, help="Spread created_at over this many days.")
+        parser.add_argument('--end-date', type=datetime.fromisoformat, default=None,
+                            help="Latest created_at (YYYY-MM-DD, default: today).")
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Parallel processes building and inserting chunks. Most useful on MySQL; "
+                                 "SQLite serializes writers.")
+
+    def handle(self, *args, **options):
+        end_date = (options['end_date'] or datetime.now(dt_timezone.utc)).date()
+        end = datetime.combine(end_date, dt_time.min, tzinfo=dt_timezone.utc)
+        factory = LeadFactory(end, options['days'], options['completed_ratio'])
+
+        count = options['count']
+        batch_size = options['batch_size']
+        chunk_size = batch_size * options['batches_per_transaction']
+        jobs = [
+            (factory, options['seed'], index, start, min(chunk_size, count - start), batch_size)
+            for index, start in enumerate(range(0, count, chunk_size))
+        ]
+
+        started = time.perf_counter()
+        created = 0
+        if options['workers'] > 1:
+            # Forked workers must not share the parent's database connection.
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(options['workers'], initializer=init_worker) as pool:
+                for size in pool.imap_unordered(generate_chunk, jobs):
+                    created += size
+                    self.report_progress(created, count, started)
+        else:
+            for job in jobs:
+                created += generate_chunk(job)
+                self.report_progress(created, count, started)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {created} leads in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def report_progress(self, created, count, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{created}/{count} leads ({created / elapsed:,.0f} rows/s)")
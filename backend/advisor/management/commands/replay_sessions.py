@@ -0,0 +1,103 @@
+import json
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from advisor.models import ConversationEvent
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay recorded conversations against a chat API as a load test. "
+        "Each session's turns are sent in order with its original think time "
+        "(scaled by --speed); sessions run concurrently. Replayed sessions "
+        "create real leads on the target, so never point this at production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8080/api/chat/')
+        parser.add_argument('--file', help="Read events from a JSON Lines event log instead of the database.")
+        parser.add_argument('--sessions', type=int, default=100, help="Maximum number of sessions to replay.")
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--speed', type=float, default=1.0,
+                            help="Think-time multiplier: 2 replays twice as fast, 0 sends turns back to back.")
+        parser.add_argument('--email-domain', default='example.com',
+                            help="Domain for the synthetic addresses sent at the email step.")
+
+    def handle(self, *args, **options):
+        sessions = self.load_sessions(options['file'], options['sessions'])
+        if not sessions:
+            raise CommandError("No recorded sessions to replay.")
+
+        self.latencies = defaultdict(list)
+        self.errors = 0
+        self.lock = threading.Lock()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            futures = [pool.submit(self.replay, number, events, options) for number, events in enumerate(sessions)]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - started
+
+        turns = sum(len(values) for values in self.latencies.values())
+        self.stdout.write(f"Replayed {len(sessions)} session(s), {turns} turn(s) in {elapsed:.1f}s, {self.errors} error(s)")
+        for state, values in sorted(self.latencies.items()):
+            values.sort()
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            self.stdout.write(f"  {state:<18} n={len(values):<6} p50={statistics.median(values):7.1f}ms p95={p95:7.1f}ms max={values[-1]:7.1f}ms")
+
+    def load_sessions(self, path, limit):
+        if path:
+            with open(path) as f:
+                events = [json.loads(line) for line in f if line.strip()]
+        else:
+            events = list(ConversationEvent.objects.order_by('created_at').values(
+                'session_id', 'state', 'valid', 'answer', 'created_at'))
+            for event in events:
+                event['created_at'] = event['created_at'].isoformat()
+
+        sessions = defaultdict(list)
+        for event in events:
+            if event.get('session_id'):
+                sessions[event['session_id']].append(event)
+        ordered = sorted(sessions.values(), key=lambda session: session[0]['created_at'])
+        return [sorted(session, key=lambda event: event['created_at']) for session in ordered[:limit]]
+
+    def replay(self, number, events, options):
+        from datetime import datetime
+
+        session = requests.Session()
+        data = {}
+        previous = None
+        for event in events:
+            created_at = datetime.fromisoformat(event['created_at'])
+            if previous is not None and options['speed'] > 0:
+                time.sleep(max(0.0, (created_at - previous).total_seconds() / options['speed']))
+            previous = created_at
+
+            body = {'current_state': event['state'], 'data': data}
+            answer = event.get('answer')
+            if event['state'] == 'email':
+                # Email answers are never recorded; substitute a synthetic one.
+                answer = f"replay{number}@{options['email_domain']}" if event['valid'] else 'not-an-email'
+            if answer is not None or event['state'] != 'intro':
+                body['user_input'] = answer
+
+            turn_started = time.perf_counter()
+            try:
+                response = session.post(options['url'], json=body, timeout=30)
+                response.raise_for_status()
+                data = response.json().get('data') or data
+            except Exception as e:
+                with self.lock:
+                    self.errors += 1
+                self.stderr.write(f"Session {number} failed at {event['state']}: {e}")
+                return
+            with self.lock:
+                self.latencies[event['state']].append((time.perf_counter() - turn_started) * 1000)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from advisor.models import Lead
+from advisor.state_machine import StateMachine
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-check the mail domains of leads whose email was accepted while DNS was unavailable. "
+        "Leads whose domain has no mail records are moved to email_undeliverable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        leads = Lead.objects.filter(email_unverified=True).exclude(email='').order_by('id')[:options['limit']]
+        verified = invalid = unknown = 0
+        for lead in leads:
+            domain = lead.email.split('@')[-1].lower()
+            verdict = StateMachine.domain_accepts_mail(domain)
+            if verdict is None:
+                unknown += 1
+            elif verdict:
+                Lead.objects.filter(id=lead.id).update(email_unverified=False)
+                verified += 1
+            else:
+                # Settled either way: take it out of the queue so it can't crowd
+                # out newer leads once --limit of these build up.
+                Lead.objects.filter(id=lead.id).update(email_unverified=False, email_undeliverable=True)
+                invalid += 1
+                self.stdout.write(f"Lead {lead.id}: {lead.email} has no mail records")
+        self.stdout.write(self.style.SUCCESS(
+            f"Verified {verified}, invalid {invalid}, still unknown {unknown}"
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from advisor.persona import get_persona
+from advisor.state_machine import StateMachine
+
+
+class Command(BaseCommand):
+    help = "Pre-generate Gemini persona variants for the chat prompts and store them in the persona cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--state', action='append', help="Only warm the given state (repeatable).")
+
+    def handle(self, *args, **options):
+        persona = get_persona()
+        if persona.model is None:
+            raise CommandError("GOOGLE_API_KEY is not set; cannot generate persona variants.")
+
+        prompts = StateMachine.persona_prompts()
+        if options['state']:
+            unknown = set(options['state']) - set(prompts)
+            if unknown:
+                raise CommandError(f"Unknown state(s): {', '.join(sorted(unknown))}")
+            prompts = {state: prompts[state] for state in options['state']}
+
+        added = persona.warm(prompts)
+        for state, prompt in prompts.items():
+            self.stdout.write(f"{state}: {len(persona.variants(state, prompt))} variant(s)")
+        self.stdout.write(self.style.SUCCESS(f"Added {added} variant(s) to {persona.cache_path}"))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisor', '0005_lead_city_lead_country_lead_country_code_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedLead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('lead_source', models.CharField(default='ProfitAdvisor_Chatbot', max_length=100)),
+                ('business_type', models.CharField(blank=True, max_length=100, null=True)),
+                ('third_party_apps', models.JSONField(blank=True, default=list, null=True)),
+                ('email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('aov', models.FloatField(blank=True, null=True)),
+                ('monthly_orders', models.IntegerField(blank=True, null=True)),
+                ('commission_rate', models.FloatField(blank=True, null=True)),
+                ('monthly_fixed_fee', models.FloatField(blank=True, null=True)),
+                ('calculated_annual_leak', models.FloatField(blank=True, null=True)),
+                ('estimated_recovery', models.FloatField(blank=True, null=True)),
+                ('lead_score_tag', models.CharField(blank=True, max_length=50, null=True)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('city', models.CharField(blank=True, max_length=100, null=True)),
+                ('region', models.CharField(blank=True, max_length=100, null=True)),
+                ('country', models.CharField(blank=True, max_length=100, null=True)),
+                ('country_code', models.CharField(blank=True, max_length=10, null=True)),
+                ('is_completed', models.BooleanField(default=False)),
+                ('consultation_requested', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['is_completed', 'created_at'], name='lead_completed_created_idx'),
+        ),
+    ]
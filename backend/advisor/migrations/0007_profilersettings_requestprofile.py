@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisor', '0006_archivedlead_lead_lead_completed_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfilerSettings',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('enabled', models.BooleanField(default=False)),
+                ('sample_rate', models.FloatField(default=0.01, help_text='Fraction of matching requests to profile (0-1).')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'profiler settings',
+            },
+        ),
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.CharField(db_index=True, max_length=200)),
+                ('state', models.CharField(blank=True, max_length=50, null=True)),
+                ('method', models.CharField(max_length=10)),
+                ('status_code', models.IntegerField(blank=True, null=True)),
+                ('duration_ms', models.FloatField()),
+                ('sample_count', models.IntegerField()),
+                ('trigger', models.CharField(max_length=20)),
+                ('folded_stacks', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisor', '0007_profilersettings_requestprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_id', models.CharField(db_index=True, max_length=32)),
+                ('lead_id', models.BigIntegerField(blank=True, null=True)),
+                ('state', models.CharField(max_length=50)),
+                ('next_state', models.CharField(max_length=50)),
+                ('valid', models.BooleanField()),
+                ('latency_ms', models.FloatField()),
+                ('answer', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisor', '0009_lead_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PricingProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('country_code', models.CharField(blank=True, max_length=10, null=True)),
+                ('business_type', models.CharField(blank=True, max_length=100, null=True)),
+                ('applova_commission_rate', models.FloatField(default=0.1)),
+                ('ltv_uplift_factor', models.FloatField(default=0.4)),
+                ('recovery_efficiency', models.FloatField(default=0.95)),
+                ('version', models.PositiveIntegerField(default=1, editable=False)),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='pricing_profile_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='pricing_profile',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='advisor.pricingprofile'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisor', '0010_pricingprofile_lead_pricing_profile_version_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lead',
+            name='email_unverified',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisor', '0011_lead_email_unverified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedlead',
+            name='email_unverified',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='archivedlead',
+            name='pricing_profile',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='advisor.pricingprofile'),
+        ),
+        migrations.AddField(
+            model_name='archivedlead',
+            name='pricing_profile_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedlead',
+            name='pricing_rates',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='pricing_rates',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisor', '0012_archive_pricing_and_rates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedlead',
+            name='email_undeliverable',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='email_undeliverable',
+            field=models.BooleanField(default=False),
+        ),
+    ]
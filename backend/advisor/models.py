@@ -1,10 +1,46 @@
+from django.core.exceptions import ImproperlyConfigured
 from django.db import models
+from django.utils import timezone
+
+class PricingProfile(models.Model):
+    """
+    Profit-model rates for a market. Blank country/business type match any.
+
+    ``calculate_profit_gain`` falls back to the constants in logic.py when no
+    active profile matches. Every save bumps ``version``; since the rates are
+    edited in place, each scored lead also keeps a copy of them in
+    ``pricing_rates``.
+    """
+    name = models.CharField(max_length=100)
+    country_code = models.CharField(max_length=10, null=True, blank=True)
+    business_type = models.CharField(max_length=100, null=True, blank=True)
+    applova_commission_rate = models.FloatField(default=0.10)
+    ltv_uplift_factor = models.FloatField(default=0.4)
+    recovery_efficiency = models.FloatField(default=0.95)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def save(self, *args, **kwargs):
+        self.country_code = (self.country_code or '').strip().upper() or None
+        self.business_type = (self.business_type or '').strip() or None
+        if self.pk:
+            self.version += 1
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.name} v{self.version} ({self.country_code or '*'}/{self.business_type or '*'})"
+
 
 class Lead(models.Model):
     lead_source = models.CharField(max_length=100, default="ProfitAdvisor_Chatbot")
     business_type = models.CharField(max_length=100, null=True, blank=True)
     third_party_apps = models.JSONField(default=list, null=True, blank=True)
     email = models.EmailField(max_length=254, null=True, blank=True)
+    # Accepted while DNS was unavailable; manage.py reverify_emails re-checks it
+    # and moves it to email_undeliverable if the domain turns out to have no mail records.
+    email_unverified = models.BooleanField(default=False)
+    email_undeliverable = models.BooleanField(default=False)
     aov = models.FloatField(null=True, blank=True)
     monthly_orders = models.IntegerField(null=True, blank=True)
     commission_rate = models.FloatField(null=True, blank=True)
@@ -12,6 +48,10 @@ class Lead(models.Model):
     calculated_annual_leak = models.FloatField(null=True, blank=True)
     estimated_recovery = models.FloatField(null=True, blank=True)
     lead_score_tag = models.CharField(max_length=50, null=True, blank=True)
+    pricing_profile = models.ForeignKey(PricingProfile, null=True, blank=True, on_delete=models.SET_NULL)
+    pricing_profile_version = models.PositiveIntegerField(null=True, blank=True)
+    # Rates that scored the lead (logic.pricing_rates), as of pricing_profile_version.
+    pricing_rates = models.JSONField(null=True, blank=True)
     
     # Location Data
     ip_address = models.GenericIPAddressField(null=True, blank=True)
@@ -23,6 +63,116 @@ class Lead(models.Model):
     is_completed = models.BooleanField(default=False)
     consultation_requested = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Watermark for incremental exports (manage.py export_leads_columnar).
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Retention scans: abandoned/completed leads older than a cutoff.
+            models.Index(fields=['is_completed', 'created_at'], name='lead_completed_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.email} - {self.created_at}"
+
+
+class ArchivedLead(models.Model):
+    """Cold copy of a Lead moved out of the live table by the retention job."""
+    original_id = models.BigIntegerField(unique=True)
+    lead_source = models.CharField(max_length=100, default="ProfitAdvisor_Chatbot")
+    business_type = models.CharField(max_length=100, null=True, blank=True)
+    third_party_apps = models.JSONField(default=list, null=True, blank=True)
+    email = models.EmailField(max_length=254, null=True, blank=True)
+    email_unverified = models.BooleanField(default=False)
+    email_undeliverable = models.BooleanField(default=False)
+    aov = models.FloatField(null=True, blank=True)
+    monthly_orders = models.IntegerField(null=True, blank=True)
+    commission_rate = models.FloatField(null=True, blank=True)
+    monthly_fixed_fee = models.FloatField(null=True, blank=True)
+    calculated_annual_leak = models.FloatField(null=True, blank=True)
+    estimated_recovery = models.FloatField(null=True, blank=True)
+    lead_score_tag = models.CharField(max_length=50, null=True, blank=True)
+    pricing_profile = models.ForeignKey(PricingProfile, null=True, blank=True, on_delete=models.SET_NULL)
+    pricing_profile_version = models.PositiveIntegerField(null=True, blank=True)
+    pricing_rates = models.JSONField(null=True, blank=True)
+
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    city = models.CharField(max_length=100, null=True, blank=True)
+    region = models.CharField(max_length=100, null=True, blank=True)
+    country = models.CharField(max_length=100, null=True, blank=True)
+    country_code = models.CharField(max_length=10, null=True, blank=True)
+
+    is_completed = models.BooleanField(default=False)
+    consultation_requested = models.BooleanField(default=False)
+    created_at = models.DateTimeField(db_index=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    # Lead fields deliberately left out: the id is kept as original_id and
+    # updated_at only serves the analytics export watermark.
+    NOT_ARCHIVED = frozenset({'id', 'updated_at'})
+
+    @classmethod
+    def from_lead(cls, lead):
+        archived_fields = {field.name for field in cls._meta.concrete_fields}
+        fields = {}
+        for field in Lead._meta.concrete_fields:
+            if field.name in cls.NOT_ARCHIVED:
+                continue
+            if field.name not in archived_fields:
+                # Never archive a lossy copy: a new Lead column needs a matching
+                # ArchivedLead column (or an entry in NOT_ARCHIVED).
+                raise ImproperlyConfigured(f"ArchivedLead has no column for Lead.{field.name}")
+            fields[field.attname] = getattr(lead, field.attname)
+        return cls(original_id=lead.id, **fields)
+
+    def __str__(self):
+        return f"{self.email} - {self.created_at} (archived)"
+
+
+class ProfilerSettings(models.Model):
+    """Admin toggle for the request profiler. Only the first row is used."""
+    enabled = models.BooleanField(default=False)
+    sample_rate = models.FloatField(default=0.01, help_text="Fraction of matching requests to profile (0-1).")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "profiler settings"
+
+    def __str__(self):
+        return f"Profiler {'on' if self.enabled else 'off'} ({self.sample_rate:.2%})"
+
+
+class RequestProfile(models.Model):
+    """Statistical profile of one request, stored as folded stacks (flamegraph.pl / speedscope)."""
+    endpoint = models.CharField(max_length=200, db_index=True)
+    state = models.CharField(max_length=50, null=True, blank=True)
+    method = models.CharField(max_length=10)
+    status_code = models.IntegerField(null=True, blank=True)
+    duration_ms = models.FloatField()
+    sample_count = models.IntegerField()
+    trigger = models.CharField(max_length=20)
+    folded_stacks = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.method} {self.endpoint} [{self.state}] {self.duration_ms:.0f}ms"
+
+
+class ConversationEvent(models.Model):
+    """
+    One ChatView turn, for funnel analysis and load replay.
+
+    Holds no PII beyond the lead id: the answer is kept for replay but never
+    for the email step.
+    """
+    session_id = models.CharField(max_length=32, db_index=True)
+    lead_id = models.BigIntegerField(null=True, blank=True)
+    state = models.CharField(max_length=50)
+    next_state = models.CharField(max_length=50)
+    valid = models.BooleanField()
+    latency_ms = models.FloatField()
+    answer = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.session_id} {self.state} -> {self.next_state} ({'valid' if self.valid else 'invalid'})"
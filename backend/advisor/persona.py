@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+
+# Gemini rewrites can only change the wording, never the key phrases the UI
+# and the sales script rely on (everything the prompt puts in **bold**).
+BOLD_PHRASE_RE = re.compile(r"\*\*(.+?)\*\*")
+
+REPHRASE_INSTRUCTION = (
+    "You are a friendly, concise restaurant profit advisor. Rephrase the following "
+    "chatbot question in your own words. Keep the same meaning, keep every phrase "
+    "wrapped in **double asterisks** exactly as written, do not add new questions "
+    "and reply with the rephrased question only.\n\nQuestion: {prompt}"
+)
+
+
+def prompt_key(state, prompt):
+    """Cache key for a state prompt. Editing the prompt text invalidates its variants."""
+    digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]
+    return f"{state}:{digest}"
+
+
+def is_acceptable_variant(prompt, variant):
+    """Reject empty or rambling rewrites and ones that dropped a key phrase."""
+    if not variant or len(variant) > len(prompt) * 3:
+        return False
+    return all(f"**{phrase}**" in variant for phrase in BOLD_PHRASE_RE.findall(prompt))
+
+
+class GeminiModel:
+    """Thin wrapper so the persona layer only depends on ``generate(text) -> str``."""
+
+    def __init__(self, model_name):
+        import google.generativeai as genai
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, text):
+        return self.model.generate_content(text).text
+
+
+class PersonaPrompts:
+    """
+    Pool of pre-generated persona variants for the ``StateMachine.STATES`` prompts.
+
+    Variants are generated offline (``manage.py warm_persona``) or at warm-up and
+    persisted to a JSON file keyed by state and prompt hash, so picking one at
+    request time is a dict lookup plus ``random.choice``. A cache miss may try a
+    live generation, but only for ``deadline`` seconds; otherwise the hard-coded
+    prompt is returned unchanged.
+    """
+
+    def __init__(self, model=None, cache_path=None, variants_per_prompt=5,
+                 deadline=0.3, live=False):
+        self.model = model
+        self.cache_path = cache_path
+        self.variants_per_prompt = variants_per_prompt
+        self.deadline = deadline
+        self.live = live
+        self._pool = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self.load()
+
+    def load(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r') as f:
+                pool = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error loading persona cache {self.cache_path}: {e}")
+            return
+        with self._lock:
+            self._pool = {key: list(values) for key, values in pool.items() if values}
+
+    def save(self):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with self._lock:
+            pool = dict(self._pool)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(pool, f, indent=4)
+        os.replace(tmp_path, self.cache_path)
+
+    def variants(self, state, prompt):
+        with self._lock:
+            return list(self._pool.get(prompt_key(state, prompt), []))
+
+    def add_variant(self, state, prompt, variant):
+        variant = (variant or '').strip()
+        if not is_acceptable_variant(prompt, variant):
+            return False
+        key = prompt_key(state, prompt)
+        with self._lock:
+            pool = self._pool.setdefault(key, [])
+            if variant in pool or len(pool) >= self.variants_per_prompt:
+                return False
+            pool.append(variant)
+        return True
+
+    def _generate(self, prompt):
+        return self.model.generate(REPHRASE_INSTRUCTION.format(prompt=prompt))
+
+    def warm(self, states, save=True):
+        """Fill the pool for every ``{state: prompt}`` pair. Returns the number of new variants."""
+        if self.model is None:
+            return 0
+        added = 0
+        for state, prompt in states.items():
+            # Allow a few extra attempts for rejected or duplicate rewrites.
+            for _ in range(self.variants_per_prompt * 2):
+                if len(self.variants(state, prompt)) >= self.variants_per_prompt:
+                    break
+                try:
+                    if self.add_variant(state, prompt, self._generate(prompt)):
+                        added += 1
+                except Exception as e:
+                    print(f"Error generating persona variant for state {state}: {e}")
+                    break
+        if save and added:
+            self.save()
+        return added
+
+    def rephrase(self, state, prompt):
+        key = prompt_key(state, prompt)
+        with self._lock:
+            pool = self._pool.get(key)
+            if pool:
+                return random.choice(pool)
+        if not self.live or self.model is None:
+            return prompt
+        return self._rephrase_live(state, prompt, key)
+
+    def _get_executor(self):
+        # Keyed by pid: live generation may run during warm-up in the gunicorn
+        # master, and a pool inherited across fork has no threads behind it.
+        pid = os.getpid()
+        if self._executor_pid != pid:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='persona')
+            self._executor_pid = pid
+            self._pending = set()
+        return self._executor
+
+    def _rephrase_live(self, state, prompt, key):
+        with self._lock:
+            executor = self._get_executor()
+            # One in-flight generation per prompt; other requests fall back.
+            if key in self._pending:
+                return prompt
+            self._pending.add(key)
+
+        def generate():
+            try:
+                variant = self._generate(prompt)
+                self.add_variant(state, prompt, variant)
+                return variant
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        future = executor.submit(generate)
+        try:
+            variant = future.result(timeout=self.deadline)
+        except FutureTimeoutError:
+            # Keep generating in the background so a later request can use it.
+            return prompt
+        except Exception as e:
+            print(f"Error generating persona variant for state {state}: {e}")
+            return prompt
+        variant = (variant or '').strip()
+        return variant if is_acceptable_variant(prompt, variant) else prompt
+
+
+_persona = None
+_persona_lock = threading.Lock()
+
+
+def build_persona(model=None):
+    if model is None and os.environ.get("GOOGLE_API_KEY"):
+        model = GeminiModel(settings.PERSONA_MODEL)
+    return PersonaPrompts(
+        model=model,
+        cache_path=settings.PERSONA_CACHE_PATH,
+        variants_per_prompt=settings.PERSONA_VARIANTS,
+        deadline=settings.PERSONA_LIVE_DEADLINE_MS / 1000.0,
+        live=settings.PERSONA_LIVE,
+    )
+
+
+def get_persona():
+    global _persona
+    if _persona is None:
+        with _persona_lock:
+            if _persona is None:
+                _persona = build_persona()
+    return _persona
+
+
+def set_persona(persona):
+    """Swap the process-wide persona (e.g. for a stub model in tests)."""
+    global _persona
+    with _persona_lock:
+        _persona = persona
@@ -0,0 +1,70 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+
+class PricingCache:
+    """
+    In-process cache of the active ``PricingProfile`` rows.
+
+    Lookups are dict probes. At most once every ``PRICING_STAMP_TTL`` seconds a
+    worker reads a version stamp (latest ``updated_at`` plus row count, one
+    indexed aggregate) and reloads the profiles only when the stamp changed, so
+    an edit in the admin reaches every worker within the TTL without a redeploy.
+    """
+
+    def __init__(self):
+        self._profiles = {}
+        self._stamp = None
+        self._checked_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def _current_stamp(self):
+        from .models import PricingProfile
+        stamp = PricingProfile.objects.aggregate(updated=Max('updated_at'), count=Count('id'))
+        return stamp['updated'], stamp['count']
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < settings.PRICING_STAMP_TTL:
+            return
+        with self._lock:
+            if not force and now - self._checked_at < settings.PRICING_STAMP_TTL:
+                return
+            self._checked_at = now
+            try:
+                stamp = self._current_stamp()
+                if stamp == self._stamp and not force:
+                    return
+                from .models import PricingProfile
+                profiles = {}
+                for profile in PricingProfile.objects.filter(is_active=True).order_by('-updated_at'):
+                    key = (profile.country_code or None, profile.business_type or None)
+                    # If two active profiles target the same market, the newest wins.
+                    profiles.setdefault(key, profile)
+            except Exception as e:
+                # Keep serving the previous profiles (or the defaults) on DB errors.
+                print(f"Error refreshing pricing profiles: {e}")
+                return
+            self._profiles = profiles
+            self._stamp = stamp
+
+    def resolve(self, country_code=None, business_type=None):
+        """Most specific active profile for the market, or None for the built-in defaults."""
+        self.refresh()
+        profiles = self._profiles
+        country_code = (country_code or '').upper() or None
+        for key in ((country_code, business_type), (country_code, None), (None, business_type), (None, None)):
+            profile = profiles.get(key)
+            if profile is not None:
+                return profile
+        return None
+
+
+cache = PricingCache()
+
+
+def resolve_pricing_profile(country_code=None, business_type=None):
+    return cache.resolve(country_code, business_type)
@@ -0,0 +1,158 @@
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+
+class StackSampler:
+    """
+    Samples the call stack of one thread at a fixed interval from a helper thread.
+
+    Produces folded stacks (``outer;inner;leaf count`` per line), the input format
+    of flamegraph.pl and speedscope. Only the profiled request pays for sampling.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def sample_count(self):
+        return sum(self.stacks.values())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def folded(self):
+        return '\n'.join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in sampling profiler for API requests.
+
+    A request is profiled when it sends ``X-Profile: <PROFILING_TOKEN>`` (only
+    when a token is configured), when it is picked by the ``PROFILING_SAMPLE_RATE``
+    env setting, or when it is picked by the sample rate of the admin
+    ``ProfilerSettings`` toggle. The admin toggle is re-read at most every
+    ``PROFILING_SETTINGS_TTL`` seconds, so a disabled profiler costs a header
+    lookup and a clock read per request. Only the newest
+    ``PROFILING_MAX_PROFILES`` profiles are kept.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._toggle_rate = 0.0
+        self._toggle_checked_at = float('-inf')
+
+    def __call__(self, request):
+        trigger = self.trigger_for(request)
+        if trigger is None:
+            return self.get_response(request)
+        return self.profile(request, trigger)
+
+    def trigger_for(self, request):
+        if not request.path.startswith(tuple(settings.PROFILING_PATHS)):
+            return None
+
+        header = request.META.get(PROFILE_HEADER)
+        token = settings.PROFILING_TOKEN
+        if header and token and hmac.compare_digest(header.encode(), token.encode()):
+            return 'header'
+
+        if settings.PROFILING_SAMPLE_RATE and random.random() < settings.PROFILING_SAMPLE_RATE:
+            return 'sample'
+
+        toggle_rate = self.toggle_rate()
+        if toggle_rate and random.random() < toggle_rate:
+            return 'admin'
+        return None
+
+    def toggle_rate(self):
+        now = time.monotonic()
+        if now - self._toggle_checked_at >= settings.PROFILING_SETTINGS_TTL:
+            self._toggle_checked_at = now
+            from .models import ProfilerSettings
+            try:
+                toggle = ProfilerSettings.objects.first()
+            except Exception as e:
+                # e.g. migrations not applied yet; keep the previous value.
+                print(f"Error reading profiler settings: {e}")
+            else:
+                self._toggle_rate = toggle.sample_rate if toggle and toggle.enabled else 0.0
+        return self._toggle_rate
+
+    def profile(self, request, trigger):
+        state = self.request_state(request)
+        sampler = StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000.0)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        from .models import RequestProfile
+        try:
+            RequestProfile.objects.create(
+                endpoint=request.path,
+                state=state,
+                method=request.method,
+                status_code=response.status_code,
+                duration_ms=duration_ms,
+                sample_count=sampler.sample_count,
+                trigger=trigger,
+                folded_stacks=sampler.folded(),
+            )
+            self.enforce_retention()
+        except Exception as e:
+            print(f"Error saving request profile for {request.path}: {e}")
+        return response
+
+    @staticmethod
+    def enforce_retention():
+        from .models import RequestProfile
+        keep = settings.PROFILING_MAX_PROFILES
+        oldest_kept = list(RequestProfile.objects.order_by('-id').values_list('id', flat=True)[keep - 1:keep])
+        if oldest_kept:
+            RequestProfile.objects.filter(id__lt=oldest_kept[0]).delete()
+
+    @staticmethod
+    def request_state(request):
+        # Chat turns carry the conversation state in the JSON body. Reading the
+        # body here is safe: Django caches it for DRF's parser.
+        if request.method != 'POST' or request.content_type != 'application/json':
+            return None
+        try:
+            state = json.loads(request.body or b'{}').get('current_state')
+        except (ValueError, AttributeError):
+            return None
+        return str(state)[:50] if state else None
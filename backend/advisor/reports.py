@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.template.loader import render_to_string
+
+BREAKDOWN_LABELS = {
+    "commission_loss": "Commission savings",
+    "payment_fee_leak": "Payment fee leak",
+    "fixed_fee_loss": "Fixed platform fees",
+    "lost_customer_value": "Recovered customer lifetime value",
+}
+
+
+def report_content(result):
+    """
+    The inputs a report is rendered from, taken from a ``process_input`` result.
+
+    Deliberately excludes the email address and lead id: two leads with the same
+    numbers get the same report, which is what makes the cache content-addressed.
+    """
+    payload = result.get("crm_payload", {})
+    return {
+        "formatted_leak": result.get("formatted_leak"),
+        "formatted_recovery": result.get("formatted_recovery"),
+        "breakdown": [
+            {
+                "label": BREAKDOWN_LABELS.get(key, key),
+                "formatted": item.get("formatted"),
+                "percentage": item.get("percentage"),
+            }
+            for key, item in result.get("breakdown", {}).items()
+        ],
+        "business_type": payload.get("business_type"),
+        "third_party_apps": payload.get("third_party_apps") or [],
+        "aov": payload.get("aov"),
+        "monthly_orders": payload.get("monthly_orders"),
+        "commission_rate": payload.get("commission_rate"),
+        "monthly_fixed_fee": payload.get("monthly_fixed_fee"),
+    }
+
+
+def report_key(content):
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def report_path(key, extension="html"):
+    return os.path.join(settings.REPORT_CACHE_DIR, f"{key}.{extension}")
+
+
+def render_pdf(html):
+    """Render HTML to PDF when WeasyPrint is installed; otherwise reports are HTML only."""
+    try:
+        from weasyprint import HTML
+    except ImportError:
+        return None
+    return HTML(string=html).write_pdf()
+
+
+def _write_atomic(path, data):
+    # Thread idents repeat across forked gunicorn workers; the pid tells them apart.
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def get_or_render_report(content):
+    """Return ``(key, html)``, rendering and caching the report on a miss."""
+    key = report_key(content)
+    html_path = report_path(key)
+    if os.path.exists(html_path):
+        with open(html_path, "r", encoding="utf-8") as f:
+            return key, f.read()
+
+    html = render_to_string("advisor/report.html", content)
+    os.makedirs(settings.REPORT_CACHE_DIR, exist_ok=True)
+    _write_atomic(html_path, html.encode("utf-8"))
+    pdf = render_pdf(html)
+    if pdf:
+        _write_atomic(report_path(key, "pdf"), pdf)
+    return key, html
+
+
+def deliver_report(key, html, email):
+    pdf_path = report_path(key, "pdf")
+    pdf = None
+    if os.path.exists(pdf_path):
+        with open(pdf_path, "rb") as f:
+            pdf = f.read()
+    if pdf:
+        body = "Your Profit Recovery Report is attached as a PDF. Open this email in an HTML-capable client to view it inline."
+    else:
+        body = "Open this email in an HTML-capable client to view your Profit Recovery Report."
+    message = EmailMultiAlternatives(
+        subject="Your Profit Recovery Report",
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[email],
+    )
+    message.attach_alternative(html, "text/html")
+    if pdf:
+        message.attach("profit-recovery-report.pdf", pdf, "application/pdf")
+    message.send()
+
+
+class ReportWorker:
+    """
+    In-process background worker for report rendering and delivery.
+
+    A single daemon thread drains a queue, so the chat response only pays for a
+    hash and a ``queue.put``. Jobs are best effort: a crash or redeploy drops
+    whatever is still queued, which is acceptable for a courtesy email.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=settings.REPORT_QUEUE_SIZE)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Started lazily so it is created in each gunicorn worker after fork.
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="report-worker", daemon=True)
+                self._thread.start()
+
+    def submit(self, content, email=None):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((content, email))
+        except queue.Full:
+            print("Report queue is full, dropping report job")
+            return False
+        return True
+
+    def join(self):
+        """Block until every queued job has been processed (tests, shutdown)."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            content, email = self._queue.get()
+            try:
+                key, html = get_or_render_report(content)
+                if email:
+                    deliver_report(key, html, email)
+            except Exception as e:
+                print(f"Error generating Profit Recovery Report: {e}")
+            finally:
+                self._queue.task_done()
+
+
+worker = ReportWorker()
+
+
+def enqueue_report(result, email=None):
+    """Queue a report for ``result`` and return its content-addressed id."""
+    content = report_content(result)
+    worker.submit(content, email)
+    return report_key(content)
@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+
+class DependencyUnavailable(Exception):
+    """An outbound dependency failed, timed out or has its circuit open."""
+
+
+class CircuitOpen(DependencyUnavailable):
+    pass
+
+
+class DeadlineExceeded(DependencyUnavailable):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker shared by all threads of a worker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and calls
+    fail immediately for ``reset_timeout`` seconds. Then a single trial call is
+    let through: success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"Circuit '{self.name}' opened after {self.failures} failure(s)")
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+                self._trial_in_flight = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def dependency_config(name):
+    return settings.RESILIENCE.get(name, {})
+
+
+def get_breaker(name):
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                config = dependency_config(name)
+                breaker = CircuitBreaker(
+                    name,
+                    failure_threshold=config.get('failure_threshold', 5),
+                    reset_timeout=config.get('reset_timeout', 30.0),
+                )
+                _breakers[name] = breaker
+    return breaker
+
+
+def reset_breakers():
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def _reset_after_fork():
+    # With preload_app the warm-up already calls through here in the gunicorn
+    # master. Pool threads don't survive fork, so a worker must not reuse the
+    # inherited pool (every call would hit its deadline), and it starts with
+    # its own closed breakers and fresh locks.
+    global _executor, _executor_lock, _breakers_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+    _breakers_lock = threading.Lock()
+    _breakers.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.RESILIENCE_MAX_WORKERS, thread_name_prefix='outbound'
+                )
+    return _executor
+
+
+def call(name, fn, *args, hedge=None, **kwargs):
+    """
+    Run ``fn(*args, **kwargs)`` for dependency ``name`` within its latency budget.
+
+    ``hedge`` is an optional alternate callable: when the primary hasn't answered
+    after the dependency's ``hedge_after`` seconds, the alternate is started too
+    and the first successful result wins. Raises ``DependencyUnavailable``
+    (``CircuitOpen`` / ``DeadlineExceeded``) or the last exception raised; every
+    failure counts against the breaker, so ``fn`` should turn negative answers
+    (e.g. NXDOMAIN) into return values rather than raise them.
+    """
+    breaker = get_breaker(name)
+    if not breaker.allow():
+        raise CircuitOpen(f"{name} circuit is open")
+
+    config = dependency_config(name)
+    timeout = config.get('timeout', 1.0)
+    deadline = time.monotonic() + timeout
+    executor = get_executor()
+    futures = [executor.submit(fn, *args, **kwargs)]
+
+    hedge_after = config.get('hedge_after')
+    if hedge is not None and hedge_after is not None and hedge_after < timeout:
+        done, _ = wait(futures, timeout=hedge_after)
+        if not done or futures[0].exception() is not None:
+            futures.append(executor.submit(hedge))
+
+    error = None
+    pending = set(futures)
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                breaker.record_success()
+                return future.result()
+            error = future.exception()
+
+    breaker.record_failure()
+    if pending:
+        for future in pending:
+            future.cancel()
+        raise DeadlineExceeded(f"{name} did not answer within {timeout:.2f}s")
+    raise error
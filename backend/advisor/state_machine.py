@@ -1,10 +1,14 @@
 
 import re
+import time
 import google.generativeai as genai
 import os
 import dns.resolver
 from django.conf import settings
-from .logic import calculate_profit_gain, get_lead_score
+from .logic import calculate_profit_gain, get_lead_score, pricing_rates
+from .domain_typos import suggest_domain
+from .pricing import resolve_pricing_profile
+from . import resilience
 
 # Configure Gemini
 # Note: In a real scenario, ensure GOOGLE_API_KEY is set in environment variables
@@ -15,13 +19,13 @@ from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 
 class StateMachine:
-    DISPOSABLE_DOMAINS = {
+    DISPOSABLE_DOMAINS = frozenset({
         'mailinator.com', 'tempmail.com', 'guerrillamail.com', '10minutemail.com', 
         'yopmail.com', 'trashmail.com', 'getairmail.com', 'sharklasers.com'
-    }
+    })
 
     @staticmethod
-    def validate_email_input(email):
+    def validate_email_input(email, check_typos=True):
         try:
             email = email.strip()
             validate_email(email)
@@ -34,21 +38,99 @@ class StateMachine:
             if domain in StateMachine.DISPOSABLE_DOMAINS:
                 return False
 
-            # DNS MX Record Check
-            try:
-                records = dns.resolver.resolve(domain, 'MX')
-                if not records:
-                    return False
-            except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.resolver.NoNameservers, dns.resolver.Timeout):
-                # Fallback: try A record if no MX record (some domains use A record for mail)
-                try:
-                    dns.resolver.resolve(domain, 'A')
-                except Exception:
-                    return False
-            
-            return True
+            # Obvious typos of popular providers (gmial.com) fail fast without
+            # DNS; process_input offers the correction.
+            if check_typos and suggest_domain(domain):
+                return False
+
+            verdict = StateMachine.domain_accepts_mail(domain)
+            if verdict is None:
+                # DNS is unavailable: accept (and flag for re-verification) or
+                # reject depending on EMAIL_DNS_FAILURE_POLICY.
+                return settings.EMAIL_DNS_FAILURE_POLICY == 'open'
+            return verdict
         except ValidationError:
             return False
+
+    @staticmethod
+    def suggest_email(email):
+        """``'jane@gmial.com'`` -> ``'jane@gmail.com'``, or None."""
+        if not isinstance(email, str) or email.count('@') != 1:
+            return None
+        username, domain = email.strip().split('@')
+        suggestion = suggest_domain(domain)
+        return f"{username}@{suggestion}" if suggestion else None
+
+    @staticmethod
+    def email_unverified(email):
+        """True if the email's domain was accepted without a DNS answer (fail-open)."""
+        domain = email.strip().split('@')[-1].lower()
+        cached = StateMachine._mail_domain_verdicts.get(domain)
+        return bool(cached) and cached[0] is None
+
+    # domain -> (verdict, expires_at); shared by all threads of a worker and
+    # primed at warm-up for popular mail domains (advisor/warmup.py). A verdict
+    # of None means DNS was unavailable and is only kept briefly.
+    _mail_domain_verdicts = {}
+    _hedge_resolver = None
+
+    @staticmethod
+    def domain_accepts_mail(domain):
+        """True/False from MX (or A) records, or None when DNS is unavailable."""
+        cached = StateMachine._mail_domain_verdicts.get(domain)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        hedge = None
+        if settings.DNS_HEDGE_NAMESERVERS:
+            resolver = StateMachine.hedge_resolver()
+            hedge = lambda: StateMachine.lookup_mail_records(domain, resolver=resolver)
+        try:
+            verdict = resilience.call('dns', StateMachine.lookup_mail_records, domain, hedge=hedge)
+            ttl = settings.DNS_VERDICT_TTL
+        except Exception as e:
+            print(f"DNS lookup for {domain} unavailable: {e}")
+            verdict = None
+            ttl = settings.DNS_UNKNOWN_VERDICT_TTL
+
+        verdicts = StateMachine._mail_domain_verdicts
+        if len(verdicts) >= settings.DNS_VERDICT_CACHE_SIZE:
+            verdicts.clear()
+        verdicts[domain] = (verdict, time.monotonic() + ttl)
+        return verdict
+
+    @staticmethod
+    def hedge_resolver():
+        if StateMachine._hedge_resolver is None:
+            resolver = dns.resolver.Resolver(configure=False)
+            resolver.nameservers = list(settings.DNS_HEDGE_NAMESERVERS)
+            StateMachine._hedge_resolver = resolver
+        return StateMachine._hedge_resolver
+
+    @staticmethod
+    def lookup_mail_records(domain, resolver=None):
+        """
+        Negative answers (NXDOMAIN, no records) return False. Timeouts and
+        resolver failures, including NoNameservers (every server answered
+        SERVFAIL or refused), raise so the resilience layer can tell an outage
+        from an invalid domain.
+        """
+        resolve = resolver.resolve if resolver else dns.resolver.resolve
+        lifetime = settings.RESILIENCE['dns']['timeout']
+        # DNS MX Record Check
+        try:
+            records = resolve(domain, 'MX', lifetime=lifetime)
+            if not records:
+                return False
+        except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+            # Fallback: try A record if no MX record (some domains use A record for mail)
+            try:
+                resolve(domain, 'A', lifetime=lifetime)
+            except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+                return False
+
+        return True
+
     STATES = {
         "intro": {
             "next": "business_type",
@@ -113,17 +195,25 @@ class StateMachine:
         self.data = data or {}
 
     def get_prompt(self):
-        # In a real implementation, we could use Gemini here to rephrase the prompt based on context
-        # For now, we return the hardcoded prompt to ensure strict adherence to the script
-        # If Gemini is required for "persona", we can wrap this.
-        
         base_prompt = self.STATES[self.current_state]["prompt"]
-        
-        # Example of using Gemini to "maintain persona" if API key is present
-        # But keeping the core message intact. 
-        # For this strict flow, hardcoded is safer and faster.
+
+        # Gemini "persona" rephrasing is served from a pre-generated variant pool
+        # (see advisor/persona.py), so the hard-coded script stays the fallback and
+        # a turn never waits on a live LLM call beyond a strict deadline.
+        if settings.PERSONA_ENABLED and self.STATES[self.current_state]["input_type"] != "none":
+            from .persona import get_persona
+            return get_persona().rephrase(self.current_state, base_prompt)
         return base_prompt
 
+    @classmethod
+    def persona_prompts(cls):
+        """The ``{state: prompt}`` pairs eligible for persona rephrasing."""
+        return {
+            state: config["prompt"]
+            for state, config in cls.STATES.items()
+            if config["input_type"] != "none"
+        }
+
     def process_input(self, user_input):
         state_config = self.STATES[self.current_state]
         
@@ -131,18 +221,34 @@ class StateMachine:
         if isinstance(user_input, str):
             user_input = user_input.strip()
         
+        validation = state_config["validation"]
+        if self.current_state == "email" and user_input and user_input == self.data.get("email_suggested_for"):
+            # The user sent the same address again after we offered a correction:
+            # they mean it, so skip the typo check and let DNS decide.
+            validation = lambda x: StateMachine.validate_email_input(x, check_typos=False)
+
         # Validate input
         try:
-            if not state_config["validation"](user_input):
+            if not validation(user_input):
                 message = "Invalid input. Please try again."
+                suggestion = None
                 if self.current_state == "email":
                     message = "the email you entered isn't correct please try again"
-                    
-                return {
+                    if validation is state_config["validation"]:
+                        suggestion = self.suggest_email(user_input)
+                    if suggestion:
+                        self.data["email_suggested_for"] = user_input
+                        message = (f"the email you entered isn't correct, did you mean {suggestion}? "
+                                   f"If {user_input} is right, send it again.")
+
+                response = {
                     "valid": False,
                     "message": message,
                     "state": self.current_state
                 }
+                if suggestion:
+                    response["suggestion"] = suggestion
+                return response
         except ValueError:
              return {
                 "valid": False,
@@ -165,6 +271,8 @@ class StateMachine:
             self.data["third_party_apps"] = user_input
         elif self.current_state == "email":
             self.data["email"] = user_input
+            self.data.pop("email_suggested_for", None)
+            self.data["email_unverified"] = StateMachine.email_unverified(user_input)
 
         # Transition
         next_state = state_config["next"]
@@ -177,12 +285,14 @@ class StateMachine:
         }
 
         if self.current_state == "result":
-            # Perform calculation
+            # Perform calculation with the rates for this lead's market
+            profile = resolve_pricing_profile(self.data.get("country_code"), self.data.get("business_type"))
             metrics = calculate_profit_gain(
                 self.data["aov"], 
                 self.data["orders"], 
                 self.data["commission"],
-                self.data.get("monthly_fixed_fee", 0)
+                self.data.get("monthly_fixed_fee", 0),
+                profile=profile
             )
             
             # Calculate total leak equivalent for backward compatibility
@@ -197,13 +307,17 @@ class StateMachine:
                 "business_type": self.data.get("business_type"),
                 "third_party_apps": self.data.get("third_party_apps"),
                 "email": self.data.get("email"),
+                "email_unverified": self.data.get("email_unverified", False),
                 "aov": self.data.get("aov"),
                 "monthly_orders": self.data.get("orders"),
                 "commission_rate": self.data.get("commission"),
                 "monthly_fixed_fee": self.data.get("monthly_fixed_fee"),
                 "calculated_annual_leak": total_leak_equivalent,
                 "estimated_recovery": metrics["total_profit_gain_potential"],
-                "lead_score_tag": lead_score
+                "lead_score_tag": lead_score,
+                "pricing_profile_id": profile.id if profile else None,
+                "pricing_profile_version": profile.version if profile else None,
+                "pricing_rates": pricing_rates(profile)
             }
 
             # Calculate percentages
@@ -250,4 +364,4 @@ class StateMachine:
         return response
 
     def get_next_prompt(self):
-        return self.STATES[self.current_state]["prompt"]
+        return self.get_prompt()
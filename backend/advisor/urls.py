@@ -1,8 +1,9 @@
 
 from django.urls import path
-from .views import ChatView, LeadView
+from .views import ChatView, LeadView, ReportView
 
 urlpatterns = [
     path('chat/', ChatView.as_view(), name='chat'),
     path('lead/', LeadView.as_view(), name='lead'),
+    path('report/<str:report_id>/', ReportView.as_view(), name='report'),
 ]
@@ -2,13 +2,19 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.http import FileResponse, Http404
 from .state_machine import StateMachine
 import os
 import json
+import time
+import uuid
 from django.conf import settings
 from datetime import datetime
 
 from .models import Lead
+from .reports import enqueue_report, report_path
+from .events import is_session_id, record_turn
+from . import resilience
 
 import requests
 
@@ -50,17 +56,29 @@ def get_client_ip(request):
         ip = request.META.get('REMOTE_ADDR')
     return ip
 
+def fetch_location(ip):
+    # Using ip-api.com (Free for non-commercial, 45 req/min)
+    # Note: Free tier is HTTP only
+    response = requests.get(f'http://ip-api.com/json/{ip}', timeout=settings.RESILIENCE['ip_geolocation']['timeout'])
+    response.raise_for_status()
+    return response.json()
+
 def get_location_from_ip(ip):
+    # Location is nice to have: on timeouts, errors or an open circuit the lead
+    # is saved without it instead of slowing down the chat.
     try:
-        # Using ip-api.com (Free for non-commercial, 45 req/min)
-        # Note: Free tier is HTTP only
-        response = requests.get(f'http://ip-api.com/json/{ip}')
-        if response.status_code == 200:
-            return response.json()
+        return resilience.call('ip_geolocation', fetch_location, ip)
     except Exception as e:
         print(f"Error getting location for IP {ip}: {e}")
     return {}
 
+def stored_country_code(lead_id):
+    try:
+        return Lead.objects.filter(id=lead_id).values_list('country_code', flat=True).first()
+    except Exception as e:
+        print(f"Error reading country for lead {lead_id}: {e}")
+        return None
+
 def save_lead(lead_data, lead_id=None, request=None):
     try:
         if lead_id:
@@ -115,13 +133,44 @@ def save_lead(lead_data, lead_id=None, request=None):
 
 class ChatView(APIView):
     def post(self, request):
+        started = time.perf_counter()
+        response = self.process_turn(request)
+
+        # One event per turn for funnel analysis and load replay (advisor/events.py)
+        try:
+            response_data = response.data
+            record_turn(
+                session_id=response_data['data'].get('session_id'),
+                lead_id=response_data['data'].get('lead_id'),
+                state=request.data.get('current_state', 'intro'),
+                next_state=response_data['state'],
+                valid=response_data.get('valid', True),
+                latency_ms=(time.perf_counter() - started) * 1000,
+                answer=request.data.get('user_input'),
+            )
+        except Exception as e:
+            print(f"Error recording conversation event: {e}")
+        return response
+
+    def process_turn(self, request):
         current_state = request.data.get('current_state', 'intro')
         user_input = request.data.get('user_input')
         data = request.data.get('data', {})
 
+        # Anonymous id tying the turns of one conversation together, including
+        # the ones before a Lead exists.
+        if not is_session_id(data.get('session_id')):
+            data['session_id'] = uuid.uuid4().hex
+
         # Get lead_id from data if it exists
         lead_id = data.get('lead_id')
 
+        # The market used for pricing profiles comes from the lead's stored
+        # location, never from the client.
+        data.pop('country_code', None)
+        if lead_id and current_state == 'email':
+            data['country_code'] = stored_country_code(lead_id)
+
         # Initialize state machine
         sm = StateMachine(current_state=current_state, data=data)
 
@@ -138,14 +187,18 @@ class ChatView(APIView):
         result = sm.process_input(user_input)
 
         if not result['valid']:
-            return Response({
+            response_data = {
                 'valid': False,
                 'message': result['message'],
                 'state': result['state'],
                 'prompt': result['message'], # Show error message to user
                 'input_type': sm.STATES[result['state']]['input_type'],
                 'data': data
-            })
+            }
+            if 'suggestion' in result:
+                # e.g. "jane@gmail.com" for "jane@gmial.com", so the UI can offer a one-click fix
+                response_data['suggestion'] = result['suggestion']
+            return Response(response_data)
         # Extract data to save from result['data']
         # We need to map the flat data structure to our model fields
         lead_data_to_save = {
@@ -156,6 +209,7 @@ class ChatView(APIView):
             'monthly_orders': result['data'].get('orders'),
             'commission_rate': result['data'].get('commission'),
             'monthly_fixed_fee': result['data'].get('monthly_fixed_fee'),
+            'email_unverified': result['data'].get('email_unverified', False),
         }
         
         # If we have a result, add those fields too
@@ -165,6 +219,9 @@ class ChatView(APIView):
                  'calculated_annual_leak': payload.get('calculated_annual_leak'),
                  'estimated_recovery': payload.get('estimated_recovery'),
                  'lead_score_tag': payload.get('lead_score_tag'),
+                 'pricing_profile_id': payload.get('pricing_profile_id'),
+                 'pricing_profile_version': payload.get('pricing_profile_version'),
+                 'pricing_rates': payload.get('pricing_rates'),
                  'is_completed': True
              })
 
@@ -186,7 +243,14 @@ class ChatView(APIView):
             response_data['prompt'] = "Calculation complete."
             
             # Auto-save the lead (already done above with is_completed=True)
-                
+
+            # Render and email the Profit Recovery Report in the background;
+            # the id lets the frontend link to the cached report.
+            try:
+                response_data['report_id'] = enqueue_report(result['result'], email=result['data'].get('email'))
+            except Exception as e:
+                print(f"Error queueing Profit Recovery Report: {e}")
+
         else:
             response_data['prompt'] = sm.get_next_prompt()
             if 'options' in sm.STATES[result['state']]:
@@ -222,3 +286,17 @@ class LeadView(APIView):
                 "status": "ignored",
                 "message": "No lead_id provided, ignoring request to avoid duplicate."
             })
+
+
+class ReportView(APIView):
+    def get(self, request, report_id):
+        # Reports are stored under the sha256 of their inputs.
+        if len(report_id) != 64 or not all(c in '0123456789abcdef' for c in report_id):
+            raise Http404("Report not found")
+
+        extension = 'pdf' if request.query_params.get('format') == 'pdf' else 'html'
+        path = report_path(report_id, extension)
+        if not os.path.exists(path):
+            raise Http404("Report not ready")
+        content_type = 'application/pdf' if extension == 'pdf' else 'text/html; charset=utf-8'
+        return FileResponse(open(path, 'rb'), content_type=content_type)
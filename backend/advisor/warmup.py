@@ -0,0 +1,63 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import connections
+from django.template.loader import get_template
+
+from .mail_domains import POPULAR_MAIL_DOMAINS
+from .pricing import cache as pricing_cache
+from .state_machine import StateMachine
+
+
+def prime_dns_verdicts(domains=POPULAR_MAIL_DOMAINS, deadline=None):
+    """Resolve MX verdicts for popular domains in parallel, giving up after ``deadline`` seconds."""
+    deadline = settings.WARMUP_DNS_DEADLINE if deadline is None else deadline
+    executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='warmup-dns')
+    futures = [executor.submit(StateMachine.domain_accepts_mail, domain) for domain in domains]
+    done, _ = wait(futures, timeout=deadline)
+    # Drop lookups that haven't started. In-flight ones are bounded by the
+    # resolver lifetime and must finish before gunicorn forks.
+    executor.shutdown(wait=True, cancel_futures=True)
+    # domain_accepts_mail returns None (instead of raising) when DNS is unavailable.
+    return sum(1 for future in done if future.exception() is None and future.result() is not None)
+
+
+def warm_up():
+    """
+    Load everything the first chat requests would otherwise pay for.
+
+    With gunicorn's ``preload_app`` this runs once in the master, so workers
+    inherit the imported modules and primed caches copy-on-write after fork.
+    Database connections are not opened here (they must not cross a fork);
+    see ``post_worker_init`` in gunicorn.conf.py.
+    """
+    started = time.perf_counter()
+
+    # Prompts for every state, including persona variants when enabled.
+    for state in StateMachine.STATES:
+        StateMachine(current_state=state).get_prompt()
+    get_template('advisor/report.html')
+    pricing_cache.refresh(force=True)
+
+    resolved = prime_dns_verdicts() if settings.WARMUP_DNS else 0
+
+    # Anything touched above must not leave a connection to be inherited.
+    connections.close_all()
+    print(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.0f}ms "
+          f"({resolved} DNS verdicts primed)")
+
+
+def open_connections():
+    """
+    Open this thread's connection to every configured database.
+
+    Django connections are per thread, so this is called from each request
+    thread of a freshly forked worker (gunicorn.conf.py) to move connection
+    setup off the first requests. Needs ``CONN_MAX_AGE`` > 0 to be kept.
+    """
+    for alias in connections:
+        try:
+            connections[alias].ensure_connection()
+        except Exception as e:
+            print(f"Error pre-opening database connection '{alias}': {e}")
@@ -0,0 +1,18 @@
+import pytest
+
+
+@pytest.fixture(scope='module')
+def migrated_db():
+    """
+    A throwaway, fully migrated database for tests that need the tables.
+
+    The committed db.sqlite3 may lag behind the migrations, so DB-backed tests
+    run against Django's test database (in memory for SQLite) instead.
+    """
+    from django.db import connection
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,118 @@
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.conf import settings
+
+REPLICA_DB = 'replica'
+PRIMARY_DB = 'default'
+
+_state = Local()
+
+
+def replica_configured():
+    return REPLICA_DB in settings.DATABASES
+
+
+@contextmanager
+def use_replica():
+    """
+    Route reads of ``REPLICA_APPS`` models to the read replica inside the block.
+
+    Meant for read-only workloads (admin browsing, exports, reporting). Anything
+    outside such a block, including the chat path, reads from the primary.
+    """
+    previous = getattr(_state, 'read_only', False)
+    _state.read_only = True
+    try:
+        yield
+    finally:
+        _state.read_only = previous
+
+
+@contextmanager
+def pin_primary():
+    """Force all reads in the block to the primary (read-your-writes)."""
+    previous = getattr(_state, 'pinned', False)
+    _state.pinned = True
+    try:
+        yield
+    finally:
+        _state.pinned = previous
+
+
+def reset_write_marker():
+    _state.wrote = False
+
+
+def wrote_to_primary():
+    return getattr(_state, 'wrote', False)
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads of lead data to the replica only when explicitly asked to.
+
+    Writes always go to the primary and mark the current request as having
+    written, so ``ReplicaRoutingMiddleware`` can pin that client to the
+    primary for ``DB_REPLICA_STICKY_SECONDS``.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not replica_configured():
+            return None
+        if model._meta.app_label not in settings.DB_REPLICA_APPS:
+            return PRIMARY_DB
+        if getattr(_state, 'pinned', False) or not getattr(_state, 'read_only', False):
+            return PRIMARY_DB
+        return REPLICA_DB
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data, so cross-alias relations are fine.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica follows the primary through replication; only allow
+        # migrating it directly when it is a standalone local database.
+        if db == REPLICA_DB:
+            return settings.DB_REPLICA_MIGRATE
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    STICKY_COOKIE = 'db_pin_primary'
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_configured():
+            return self.get_response(request)
+
+        read_only = request.method in self.SAFE_METHODS and request.path.startswith(
+            tuple(settings.DB_REPLICA_READ_PATHS)
+        )
+        pinned = self.STICKY_COOKIE in request.COOKIES
+
+        reset_write_marker()
+        if read_only and not pinned:
+            with use_replica():
+                response = self.get_response(request)
+        elif pinned:
+            with pin_primary():
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+
+        if wrote_to_primary():
+            response.set_cookie(
+                self.STICKY_COOKIE, '1',
+                max_age=settings.DB_REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        reset_write_marker()
+        return response
@@ -26,6 +26,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'core.db_router.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -34,6 +35,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'advisor.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -78,6 +80,35 @@ if os.environ.get('DB_HOST'):
     if os.environ.get('INSTANCE_CONNECTION_NAME'):
         DATABASES['default']['HOST'] = '/cloudsql/' + os.environ.get('INSTANCE_CONNECTION_NAME')
 
+# Optional read replica (core/db_router.py)
+# Admin browsing, exports and reporting read lead data from the replica; the chat
+# path and anything that just wrote stays on the primary.
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = dict(DATABASES['default'], HOST=os.environ.get('DB_REPLICA_HOST'))
+    if os.environ.get('REPLICA_INSTANCE_CONNECTION_NAME'):
+        DATABASES['replica']['HOST'] = '/cloudsql/' + os.environ.get('REPLICA_INSTANCE_CONNECTION_NAME')
+elif os.environ.get('DB_REPLICA_SQLITE'):
+    # Local testing: a second SQLite file standing in for the replica.
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DB_REPLICA_SQLITE'),
+    }
+
+# Keep connections open between requests so the ones opened at worker start-up
+# (gunicorn.conf.py) are reused instead of reconnecting per request.
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = int(os.environ.get('CONN_MAX_AGE', '60'))
+    database['CONN_HEALTH_CHECKS'] = True
+
+if 'replica' in DATABASES:
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+DB_REPLICA_APPS = ['advisor']
+DB_REPLICA_READ_PATHS = ['/admin/']
+DB_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', '10'))
+DB_REPLICA_MIGRATE = 'DB_REPLICA_SQLITE' in os.environ
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -114,3 +145,92 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+
+# Gemini persona prompts (advisor/persona.py)
+# Variants are pre-generated with `python manage.py warm_persona`; live generation
+# on a cache miss is opt-in and bounded by PERSONA_LIVE_DEADLINE_MS.
+PERSONA_ENABLED = os.environ.get('PERSONA_ENABLED', 'False') == 'True'
+PERSONA_LIVE = os.environ.get('PERSONA_LIVE', 'False') == 'True'
+PERSONA_LIVE_DEADLINE_MS = int(os.environ.get('PERSONA_LIVE_DEADLINE_MS', '300'))
+PERSONA_VARIANTS = int(os.environ.get('PERSONA_VARIANTS', '5'))
+PERSONA_MODEL = os.environ.get('PERSONA_MODEL', 'gemini-1.5-flash')
+PERSONA_CACHE_PATH = os.environ.get('PERSONA_CACHE_PATH', str(BASE_DIR / 'data' / 'persona_prompts.json'))
+
+# Lead retention (manage.py prune_leads)
+LEAD_ABANDONED_RETENTION_DAYS = int(os.environ.get('LEAD_ABANDONED_RETENTION_DAYS', '30'))
+LEAD_COMPLETED_RETENTION_DAYS = int(os.environ.get('LEAD_COMPLETED_RETENTION_DAYS', '365'))
+LEAD_RETENTION_BATCH_SIZE = int(os.environ.get('LEAD_RETENTION_BATCH_SIZE', '1000'))
+
+# Profit Recovery Reports (advisor/reports.py)
+REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR', str(BASE_DIR / 'data' / 'reports'))
+REPORT_QUEUE_SIZE = int(os.environ.get('REPORT_QUEUE_SIZE', '1000'))
+
+# Without EMAIL_HOST, reports are "sent" to files in data/outbox as a local SMTP
+# stand-in. For a real SMTP round trip locally, run
+# `python -m aiosmtpd -n -l localhost:1025` and set EMAIL_HOST=localhost EMAIL_PORT=1025.
+if os.environ.get('EMAIL_HOST'):
+    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    EMAIL_HOST = os.environ.get('EMAIL_HOST')
+    EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '587'))
+    EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+    EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+    EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False') == 'True'
+    EMAIL_TIMEOUT = 10
+else:
+    EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+    EMAIL_FILE_PATH = BASE_DIR / 'data' / 'outbox'
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'Applova Profit Advisor <no-reply@applova.io>')
+
+# Request profiler (advisor/profiling.py)
+# Profiles are stored as folded stacks and listed under Admin > Request profiles.
+PROFILING_PATHS = ['/api/']
+# X-Profile header triggering is off unless a token is set.
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN', '')
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_INTERVAL_MS = float(os.environ.get('PROFILING_INTERVAL_MS', '5'))
+PROFILING_SETTINGS_TTL = int(os.environ.get('PROFILING_SETTINGS_TTL', '30'))
+# Only the newest profiles are kept.
+PROFILING_MAX_PROFILES = int(os.environ.get('PROFILING_MAX_PROFILES', '500'))
+
+# Worker warm-up (advisor/warmup.py, gunicorn.conf.py)
+WARMUP_DNS = os.environ.get('WARMUP_DNS', 'True') == 'True'
+WARMUP_DNS_DEADLINE = float(os.environ.get('WARMUP_DNS_DEADLINE', '2'))
+DNS_VERDICT_TTL = int(os.environ.get('DNS_VERDICT_TTL', '3600'))
+DNS_VERDICT_CACHE_SIZE = int(os.environ.get('DNS_VERDICT_CACHE_SIZE', '10000'))
+
+# Conversation event log (advisor/events.py)
+# 'db' writes ConversationEvent rows, 'file' appends JSON Lines to EVENT_LOG_PATH.
+EVENT_LOG_SINK = os.environ.get('EVENT_LOG_SINK', 'db')
+EVENT_LOG_PATH = os.environ.get('EVENT_LOG_PATH', str(BASE_DIR / 'data' / 'events.jsonl'))
+EVENT_LOG_BATCH_SIZE = int(os.environ.get('EVENT_LOG_BATCH_SIZE', '200'))
+EVENT_LOG_FLUSH_INTERVAL = float(os.environ.get('EVENT_LOG_FLUSH_INTERVAL', '5'))
+
+# Columnar analytics snapshot (manage.py export_leads_columnar)
+ANALYTICS_EXPORT_DIR = os.environ.get('ANALYTICS_EXPORT_DIR', str(BASE_DIR / 'data' / 'analytics'))
+
+# Pricing profiles (advisor/pricing.py): seconds between version-stamp checks per worker
+PRICING_STAMP_TTL = int(os.environ.get('PRICING_STAMP_TTL', '15'))
+
+# Outbound dependencies in the chat path (advisor/resilience.py)
+# timeout is the total latency budget per call; after failure_threshold
+# consecutive failures the circuit opens for reset_timeout seconds.
+RESILIENCE = {
+    'dns': {
+        'timeout': float(os.environ.get('DNS_TIMEOUT', '1.5')),
+        'hedge_after': float(os.environ.get('DNS_HEDGE_AFTER', '0.3')),
+        'failure_threshold': 5,
+        'reset_timeout': 30.0,
+    },
+    'ip_geolocation': {
+        'timeout': float(os.environ.get('IP_GEOLOCATION_TIMEOUT', '1.0')),
+        'failure_threshold': 3,
+        'reset_timeout': 60.0,
+    },
+}
+RESILIENCE_MAX_WORKERS = int(os.environ.get('RESILIENCE_MAX_WORKERS', '16'))
+# 'open': accept the email when DNS is down and flag the lead for re-verification.
+# 'closed': reject it and ask the user to try again.
+EMAIL_DNS_FAILURE_POLICY = os.environ.get('EMAIL_DNS_FAILURE_POLICY', 'open')
+# Alternate resolvers raced against the system resolver after DNS_HEDGE_AFTER seconds.
+DNS_HEDGE_NAMESERVERS = [ns for ns in os.environ.get('DNS_HEDGE_NAMESERVERS', '').split(',') if ns]
+DNS_UNKNOWN_VERDICT_TTL = int(os.environ.get('DNS_UNKNOWN_VERDICT_TTL', '30'))
@@ -5,3 +5,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+if os.environ.get('WARMUP', 'True') == 'True':
+    from advisor.warmup import warm_up
+    warm_up()
@@ -0,0 +1,59 @@
+# Gunicorn configuration for the Profit Advisor backend.
+#
+# The chat path is I/O bound (database, DNS, ip-api.com), so each worker runs a
+# pool of threads. The app is preloaded and warmed in the master (see
+# advisor/warmup.py) so workers share its memory copy-on-write.
+import gc
+import os
+import threading
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+worker_class = 'gthread'
+# Every request thread may keep a database connection open (CONN_MAX_AGE), so
+# workers x threads is also the connection count. Size WEB_CONCURRENCY to the
+# container's CPU quota; the host's CPU count says nothing about it.
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = 20
+keepalive = 5
+# Recycle workers occasionally so slow leaks can't grow RSS unbounded.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = max_requests // 10
+accesslog = '-'
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is imported and warmed, right
+    # before the first fork. Moving everything allocated so far into the
+    # permanent generation keeps the collector from touching (and un-sharing)
+    # those pages in the workers.
+    if preload_app:
+        gc.collect()
+        gc.freeze()
+
+
+def post_worker_init(worker):
+    # Connections are per thread, so open one in each request thread of the
+    # gthread pool. The barrier makes sure every thread takes one task.
+    from advisor.warmup import open_connections
+
+    pool = getattr(worker, 'tpool', None)
+    if pool is None:
+        open_connections()
+        return
+
+    # The configured size, which --threads on the command line may override.
+    threads = worker.cfg.threads
+    barrier = threading.Barrier(threads)
+
+    def open_in_thread():
+        open_connections()
+        try:
+            barrier.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            pass
+
+    for future in [pool.submit(open_in_thread) for _ in range(threads)]:
+        future.result()
@@ -0,0 +1,130 @@
+"""
+Measure per-worker memory and first-request latency of the gunicorn setup.
+
+Starts gunicorn with gunicorn.conf.py, sends one chat turn of each kind per
+worker thread and reports RSS/PSS/USS of every worker (Linux /proc). The turns
+are the intro (no I/O), a first answer (creates a Lead: database write) and an
+email answer for a popular domain (MX lookup), so the pre-opened connections
+and primed DNS verdicts show up in the first-request numbers. The measured
+turns write Lead rows to the configured database. Compare runs:
+
+    python scripts/measure_workers.py
+    python scripts/measure_workers.py --no-preload --no-warmup
+
+Run from the backend directory.
+"""
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def smaps_rollup(pid):
+    """Return ``{'rss': kB, 'pss': kB, 'uss': kB}`` for a process."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':'):
+                values[parts[0][:-1]] = int(parts[1])
+    return {
+        'rss': values.get('Rss', 0),
+        'pss': values.get('Pss', 0),
+        'uss': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0),
+    }
+
+
+def worker_pids(master_pid):
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+ANSWERS = {
+    'business_type': 'QSR', 'aov': 30.0, 'orders': 500, 'commission': 28.0,
+    'monthly_fixed_fee': 120.0, 'third_party_apps': ['DoorDash'],
+}
+
+TURNS = {
+    'intro': {'current_state': 'intro'},
+    'db write': {'current_state': 'business_type', 'user_input': 'QSR', 'data': {}},
+    'email': {'current_state': 'email', 'user_input': 'owner@gmail.com', 'data': ANSWERS},
+}
+
+
+def chat_request(url, turn='intro'):
+    body = json.dumps(TURNS[turn]).encode()
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+    return (time.perf_counter() - started) * 1000
+
+
+def wait_until_up(url, deadline):
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url.rsplit('/api/', 1)[0] + '/admin/login/', timeout=1).read()
+            return True
+        except Exception:
+            time.sleep(0.2)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', default='8099')
+    parser.add_argument('--workers', default='2')
+    parser.add_argument('--threads', default='8')
+    parser.add_argument('--no-preload', action='store_true')
+    parser.add_argument('--no-warmup', action='store_true')
+    args = parser.parse_args()
+
+    env = dict(
+        os.environ, PORT=args.port, WEB_CONCURRENCY=args.workers, GUNICORN_THREADS=args.threads,
+        GUNICORN_PRELOAD='False' if args.no_preload else 'True',
+        WARMUP='False' if args.no_warmup else 'True',
+    )
+    started = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--access-logfile', os.devnull,
+         'core.wsgi:application'],
+        env=env,
+    )
+    url = f'http://127.0.0.1:{args.port}/api/chat/'
+    try:
+        # Readiness is probed via the admin login page so the chat endpoint's
+        # first hits below are genuinely the first chat requests.
+        if not wait_until_up(url, time.monotonic() + 60):
+            sys.exit("gunicorn did not come up")
+        boot_ms = (time.monotonic() - started) * 1000
+
+        concurrency = int(args.workers) * int(args.threads)
+        first = {}
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for turn in TURNS:
+                first[turn] = list(pool.map(chat_request, [url] * concurrency, [turn] * concurrency))
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            steady = list(pool.map(chat_request, [url] * concurrency * 4, ['db write'] * concurrency * 4))
+
+        print(f"preload={not args.no_preload} warmup={not args.no_warmup} "
+              f"workers={args.workers} threads={args.threads}")
+        print(f"boot until ready: {boot_ms:.0f}ms")
+        for turn, timings in first.items():
+            print(f"first {turn + ':':<10} p50={statistics.median(timings):.1f}ms max={max(timings):.1f}ms")
+        print(f"steady db write: p50={statistics.median(steady):.1f}ms max={max(steady):.1f}ms")
+        print(f"master {server.pid}: " + ' '.join(f"{k}={v / 1024:.1f}MB" for k, v in smaps_rollup(server.pid).items()))
+        for pid in worker_pids(server.pid):
+            print(f"worker {pid}: " + ' '.join(f"{k}={v / 1024:.1f}MB" for k, v in smaps_rollup(pid).items()))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+if __name__ == '__main__':
+    main()
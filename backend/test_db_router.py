@@ -0,0 +1,96 @@
+import os
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connections
+from django.test import RequestFactory, override_settings
+from django.urls import resolve
+
+from advisor.models import Lead
+from core.db_router import PrimaryReplicaRouter, ReplicaRoutingMiddleware, use_replica
+
+router = PrimaryReplicaRouter()
+
+
+@pytest.fixture
+def two_databases(tmp_path):
+    """
+    Two SQLite files, as with DB_REPLICA_SQLITE: the primary and a stand-in for
+    the replica. They are migrated separately and hold different leads, so a
+    query's result shows which database answered it.
+    """
+    default = connections['default']
+    default.close()
+    old_name = default.settings_dict['NAME']
+    default.settings_dict['NAME'] = str(tmp_path / 'primary.sqlite3')
+    connections.settings['replica'] = dict(default.settings_dict, NAME=str(tmp_path / 'replica.sqlite3'))
+    databases = {'default': default.settings_dict, 'replica': connections.settings['replica']}
+    try:
+        with override_settings(DATABASES=databases, DB_REPLICA_MIGRATE=True):
+            for alias in databases:
+                call_command('migrate', database=alias, verbosity=0)
+            Lead.objects.using('default').create(email='primary@example.com')
+            Lead.objects.using('replica').create(email='replica@example.com')
+            yield
+    finally:
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        default.close()
+        default.settings_dict['NAME'] = old_name
+
+
+def emails():
+    return list(Lead.objects.values_list('email', flat=True))
+
+
+def test_reads_default_to_primary_and_replica_is_opt_in(two_databases):
+    assert emails() == ['primary@example.com']
+    with use_replica():
+        assert emails() == ['replica@example.com']
+        # Auth and sessions never leave the primary.
+        assert router.db_for_read(User) == 'default'
+        Lead.objects.create(email='written@example.com')
+    assert Lead.objects.using('default').filter(email='written@example.com').exists()
+    assert not Lead.objects.using('replica').filter(email='written@example.com').exists()
+
+
+def test_no_replica_configured_leaves_routing_to_django():
+    with use_replica():
+        assert router.db_for_read(Lead) is None
+
+
+def admin_changelist(middleware, user, cookies=None):
+    request = RequestFactory().get('/admin/advisor/lead/')
+    request.user = user
+    request.COOKIES.update(cookies or {})
+    response = middleware(request)
+    response.render()
+    return response.content.decode()
+
+
+@override_settings(EVENT_LOG_SINK='off')
+def test_admin_reads_hit_the_replica_and_chat_writes_the_primary(two_databases):
+    user = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+    middleware = ReplicaRoutingMiddleware(lambda request: resolve(request.path).func(request))
+
+    page = admin_changelist(middleware, user)
+    assert 'replica@example.com' in page and 'primary@example.com' not in page
+
+    request = RequestFactory().post('/api/chat/', {'current_state': 'business_type', 'user_input': 'QSR', 'data': {}},
+                                    content_type='application/json')
+    response = middleware(request)
+    lead_id = response.data['data']['lead_id']
+    assert Lead.objects.using('default').filter(id=lead_id, business_type='QSR').exists()
+    assert not Lead.objects.using('replica').filter(business_type='QSR').exists()
+    assert ReplicaRoutingMiddleware.STICKY_COOKIE in response.cookies
+
+    # Right after a write the same client reads its own writes from the primary.
+    page = admin_changelist(middleware, user, {ReplicaRoutingMiddleware.STICKY_COOKIE: '1'})
+    assert 'primary@example.com' in page and 'replica@example.com' not in page
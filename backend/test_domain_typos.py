@@ -0,0 +1,63 @@
+import os
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from advisor.domain_typos import osa_distance, suggest_domain
+from advisor.state_machine import StateMachine
+
+
+def test_suggests_popular_domain_for_typos():
+    assert suggest_domain('gmial.com') == 'gmail.com'
+    assert suggest_domain('yaho.com') == 'yahoo.com'
+    assert suggest_domain('hotmial.com') == 'hotmail.com'
+    assert suggest_domain('gmail.con') == 'gmail.com'
+    assert suggest_domain('yaho.co.uk') == 'yahoo.co.uk'
+    assert suggest_domain('comcats.net') == 'comcast.net'
+    assert suggest_domain('gmai.com') == 'gmail.com'
+    assert suggest_domain('gmaill.com') == 'gmail.com'
+
+
+def test_leaves_real_domains_alone():
+    for domain in ('gmail.com', 'mail.com', 'email.com', 'gmc.com', 'hotmail.es', 'myrestaurant.com', 'mail.myrestaurant.com',
+                   'cloud.com', 'olive.com', 'love.com', 'line.com', 'life.com', 'main.com', 'mall.com',
+                   'shah.com', 'tree.com', 'fred.com'):
+        assert suggest_domain(domain) is None, domain
+
+
+def test_osa_distance_counts_transposition_once():
+    assert osa_distance('gmial', 'gmail') == 1
+    assert osa_distance('yaho', 'yahoo') == 1
+    assert osa_distance('abc', 'abc') == 0
+
+
+def test_typo_fails_before_dns_with_suggestion(monkeypatch):
+    def no_dns(domain):
+        raise AssertionError("DNS must not be queried for a typo")
+
+    monkeypatch.setattr(StateMachine, 'domain_accepts_mail', staticmethod(no_dns))
+    result = StateMachine(current_state='email').process_input('owner@gmial.com')
+    assert result['valid'] is False
+    assert result['suggestion'] == 'owner@gmail.com'
+    assert 'did you mean owner@gmail.com' in result['message']
+
+
+def test_resending_the_same_address_overrides_the_suggestion(monkeypatch):
+    checked = []
+
+    def dns(domain):
+        checked.append(domain)
+        return True
+
+    monkeypatch.setattr(StateMachine, 'domain_accepts_mail', staticmethod(dns))
+    sm = StateMachine(current_state='email', data={
+        "business_type": "QSR", "aov": 30.0, "orders": 500, "commission": 28.0,
+        "monthly_fixed_fee": 120.0, "third_party_apps": ["DoorDash"],
+    })
+    assert sm.process_input('owner@gmial.com')['valid'] is False
+    result = sm.process_input('owner@gmial.com')
+    assert result['valid'] is True
+    assert checked == ['gmial.com']
+    assert result['data']['email'] == 'owner@gmial.com'
+    assert 'email_suggested_for' not in result['data']
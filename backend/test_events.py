@@ -0,0 +1,111 @@
+import json
+import os
+import time
+import uuid
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+import pytest
+from django.test import override_settings
+
+from advisor import events
+from advisor.events import EventBuffer, record_turn
+from advisor.models import ConversationEvent
+
+SESSION = uuid.uuid4().hex
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    path = tmp_path / 'events.jsonl'
+    monkeypatch.setattr(events, 'buffer', EventBuffer())
+    with override_settings(EVENT_LOG_SINK='file', EVENT_LOG_PATH=str(path),
+                           EVENT_LOG_BATCH_SIZE=3, EVENT_LOG_FLUSH_INTERVAL=3600):
+        yield path
+
+
+def read(path):
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def turn(state='aov', answer='30', **overrides):
+    fields = dict(session_id=SESSION, lead_id=7, state=state, next_state='orders',
+                  valid=True, latency_ms=1.5, answer=answer)
+    fields.update(overrides)
+    record_turn(**fields)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_buffer_writes_in_batches_and_on_flush(log):
+    turn()
+    turn()
+    assert read(log) == []
+    turn()
+    # A full buffer wakes the flusher thread instead of writing in the request.
+    assert wait_for(lambda: len(read(log)) == 3)
+
+    turn()
+    assert events.buffer.flush() == 1
+    assert events.buffer.flush() == 0
+    assert len(read(log)) == 4
+
+
+def test_email_answers_are_never_recorded(log):
+    turn(state='email', answer='owner@example.com')
+    events.buffer.flush()
+    assert read(log)[0]['answer'] is None
+    assert 'owner@example.com' not in log.read_text()
+
+
+def test_client_values_that_dont_fit_are_dropped(log):
+    turn(session_id='x' * 40)
+    turn(session_id=SESSION.upper())
+    turn(state='s' * 60)
+    turn(lead_id='not-a-number')
+    turn(lead_id=2 ** 70)
+    events.buffer.flush()
+    assert [event['lead_id'] for event in read(log)] == [None, None]
+
+
+def test_answers_are_capped(log):
+    turn(answer='x' * 10000)
+    turn(state='third_party_apps', answer=['DoorDash', 'Uber Eats'])
+    turn(answer={'nested': ['x' * 10000]})
+    turn(state='third_party_apps', answer=['a'] * 1000)
+    events.buffer.flush()
+    answers = [event['answer'] for event in read(log)]
+    assert answers == ['x' * 200, ['DoorDash', 'Uber Eats'], None, None]
+
+
+def test_failed_writes_are_kept_for_the_next_flush(log):
+    def broken(events):
+        raise OSError("disk full")
+
+    turn()
+    events.buffer._write_file = broken
+    assert events.buffer.flush() == 0
+    del events.buffer._write_file
+    assert events.buffer.flush() == 1
+    assert len(read(log)) == 1
+
+
+def test_db_sink_writes_one_bulk_insert(migrated_db, monkeypatch):
+    monkeypatch.setattr(events, 'buffer', EventBuffer())
+    with override_settings(EVENT_LOG_SINK='db', EVENT_LOG_BATCH_SIZE=2, EVENT_LOG_FLUSH_INTERVAL=3600):
+        turn(state='business_type', answer='QSR')
+        turn(state='email', answer='owner@example.com')
+        assert wait_for(lambda: ConversationEvent.objects.filter(session_id=SESSION).count() == 2)
+    rows = list(ConversationEvent.objects.filter(session_id=SESSION).order_by('id'))
+    assert [(row.state, row.answer) for row in rows] == [('business_type', 'QSR'), ('email', None)]
+    ConversationEvent.objects.all().delete()
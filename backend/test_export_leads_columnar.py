@@ -0,0 +1,79 @@
+import os
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+import pytest
+from django.core.management import call_command
+
+from advisor.models import Lead
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.dataset as ds  # noqa: E402
+
+
+@pytest.fixture
+def export_dir(migrated_db, tmp_path):
+    yield tmp_path
+    Lead.objects.all().delete()
+
+
+def export(path, *args):
+    call_command('export_leads_columnar', f'--output-dir={path}', *args, stdout=StringIO())
+
+
+def read(path):
+    dataset = ds.dataset(os.path.join(path, 'leads'), format='parquet', partitioning='hive')
+    return sorted(dataset.to_table().to_pylist(), key=lambda row: (row['id'], row['updated_at']))
+
+
+def make_lead(created, updated=None, **fields):
+    lead = Lead.objects.create(**fields)
+    Lead.objects.filter(id=lead.id).update(created_at=created, updated_at=updated or created)
+    return lead
+
+
+def test_incremental_export_partitions_flattens_and_rebuilds(export_dir):
+    march = datetime(2026, 3, 10, 12, tzinfo=dt_timezone.utc)
+    april = datetime(2026, 4, 2, 9, tzinfo=dt_timezone.utc)
+    first = make_lead(march, business_type="QSR", third_party_apps=["DoorDash", "Uber Eats"])
+    second = make_lead(april, business_type="Full Service", third_party_apps="Grubhub")
+
+    export(export_dir)
+    rows = read(export_dir)
+    assert [row['id'] for row in rows] == [first.id, second.id]
+    assert sorted(os.listdir(export_dir / 'leads')) == ['_watermark.json', 'month=2026-03', 'month=2026-04']
+    assert str(rows[0]['month']) == '2026-03'
+    assert rows[0]['third_party_apps'] == ['DoorDash', 'Uber Eats']
+    assert rows[0]['third_party_app_count'] == 2
+    assert (rows[0]['uses_doordash'], rows[0]['uses_uber_eats'], rows[0]['uses_grubhub']) == (True, True, False)
+    assert rows[1]['third_party_apps'] == ['Grubhub']
+    assert 'email' not in rows[0] and 'ip_address' not in rows[0]
+
+    # Nothing changed: nothing is appended.
+    export(export_dir)
+    assert len(read(export_dir)) == 2
+
+    # Same updated_at as the watermark row but a higher id: the id tie-break picks it up.
+    tied = make_lead(april, business_type="QSR")
+    # An updated lead is appended again; readers keep the newest row per id.
+    Lead.objects.filter(id=first.id).update(business_type="Fast Casual",
+                                            updated_at=datetime(2026, 5, 1, tzinfo=dt_timezone.utc))
+    export(export_dir)
+    rows = read(export_dir)
+    assert [row['id'] for row in rows] == [first.id, first.id, second.id, tied.id]
+    assert [row['business_type'] for row in rows if row['id'] == first.id] == ["QSR", "Fast Casual"]
+
+    # --full replaces the dataset instead of adding a second copy.
+    export(export_dir, '--full')
+    rows = read(export_dir)
+    assert [(row['id'], row['business_type']) for row in rows] == [
+        (first.id, "Fast Casual"), (second.id, "Full Service"), (tied.id, "QSR"),
+    ]
+    assert [name for name in os.listdir(export_dir) if name != 'leads'] == []
+    export(export_dir)
+    assert len(read(export_dir)) == 3
@@ -0,0 +1,41 @@
+import os
+from io import StringIO
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.core.management import call_command
+
+from advisor.logic import calculate_profit_gain, get_lead_score
+from advisor.management.commands.generate_leads import SYNTHETIC_LEAD_SOURCE
+from advisor.models import Lead
+
+ARGS = ['--count=250', '--seed=5', '--end-date=2026-01-01', '--batch-size=40', '--batches-per-transaction=2']
+
+
+def generate():
+    call_command('generate_leads', *ARGS, stdout=StringIO())
+    rows = list(Lead.objects.filter(lead_source=SYNTHETIC_LEAD_SOURCE).order_by('id').values())
+    Lead.objects.all().delete()
+    for row in rows:
+        del row['id']
+    return rows
+
+
+def test_same_seed_and_end_date_give_identical_rows(migrated_db):
+    first = generate()
+    assert len(first) == 250
+    assert first == generate()
+
+
+def test_completed_leads_are_scored_like_the_chat(migrated_db):
+    rows = [row for row in generate() if row['is_completed']]
+    assert rows
+    for row in rows:
+        metrics = calculate_profit_gain(row['aov'], row['monthly_orders'], row['commission_rate'],
+                                        row['monthly_fixed_fee'])
+        assert row['estimated_recovery'] == metrics['total_profit_gain_potential']
+        assert row['lead_score_tag'] == get_lead_score(metrics['total_profit_gain_potential'])
+        assert row['third_party_apps'] and row['email'].endswith('@example.com')
@@ -0,0 +1,81 @@
+import os
+import time
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.test import override_settings
+from advisor.persona import PersonaPrompts, prompt_key, set_persona
+from advisor.state_machine import StateMachine
+
+
+class StubModel:
+    """Stand-in for Gemini: echoes the prompt with a prefix, optionally slowly."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def generate(self, text):
+        self.calls += 1
+        time.sleep(self.delay)
+        prompt = text.split("Question: ", 1)[1]
+        return f"Quick one #{self.calls}: {prompt}"
+
+
+def test_warm_persists_variants_and_serves_from_cache(tmp_path):
+    cache_path = str(tmp_path / 'persona.json')
+    prompts = StateMachine.persona_prompts()
+    persona = PersonaPrompts(model=StubModel(), cache_path=cache_path, variants_per_prompt=3)
+    assert persona.warm(prompts) == 3 * len(prompts)
+
+    # A fresh instance without a model serves only what was persisted.
+    reloaded = PersonaPrompts(model=None, cache_path=cache_path, variants_per_prompt=3)
+    aov_prompt = prompts['aov']
+    assert reloaded.rephrase('aov', aov_prompt) in reloaded.variants('aov', aov_prompt)
+    assert "**average order value**" in reloaded.rephrase('aov', aov_prompt)
+    # Editing the prompt text changes its key, so stale variants are not served.
+    assert prompt_key('aov', aov_prompt) != prompt_key('aov', aov_prompt + '!')
+    assert reloaded.rephrase('aov', aov_prompt + '!') == aov_prompt + '!'
+
+
+def test_live_generation_respects_deadline():
+    prompt = StateMachine.STATES['orders']['prompt']
+    persona = PersonaPrompts(model=StubModel(delay=0.2), deadline=0.01, live=True)
+    started = time.monotonic()
+    assert persona.rephrase('orders', prompt) == prompt
+    assert time.monotonic() - started < 0.15
+    # The timed-out generation finishes in the background and fills the pool.
+    time.sleep(0.3)
+    assert persona.rephrase('orders', prompt).startswith("Quick one")
+
+
+def test_state_machine_uses_persona_when_enabled():
+    persona = PersonaPrompts(model=StubModel(), variants_per_prompt=1)
+    persona.warm(StateMachine.persona_prompts(), save=False)
+    set_persona(persona)
+    try:
+        with override_settings(PERSONA_ENABLED=True):
+            assert StateMachine('aov').get_prompt().startswith("Quick one")
+            assert StateMachine('result').get_prompt() == "Calculation complete."
+        assert StateMachine('aov').get_prompt() == StateMachine.STATES['aov']['prompt']
+    finally:
+        set_persona(None)
+
+
+def test_live_generation_works_after_fork():
+    persona = PersonaPrompts(model=StubModel(), variants_per_prompt=3, deadline=1.0, live=True)
+    prompt = StateMachine.STATES['aov']['prompt']
+    assert persona.rephrase('aov', prompt).startswith("Quick one")
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            # Pool is full in the parent, so use another prompt to force a live call.
+            ok = persona.rephrase('orders', StateMachine.STATES['orders']['prompt']).startswith("Quick one")
+        except BaseException:
+            ok = False
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
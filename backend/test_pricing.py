@@ -0,0 +1,100 @@
+import os
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+import pytest
+from django.test import RequestFactory, override_settings
+
+from advisor import pricing
+from advisor.logic import calculate_profit_gain, pricing_rates
+from advisor.models import Lead, PricingProfile
+from advisor.pricing import PricingCache
+from advisor.state_machine import StateMachine
+from advisor.views import ChatView
+
+ANSWERS = {
+    "business_type": "QSR", "aov": 30.0, "orders": 500, "commission": 28.0,
+    "monthly_fixed_fee": 120.0, "third_party_apps": ["DoorDash"],
+}
+
+
+@pytest.fixture
+def profiles(migrated_db):
+    yield
+    Lead.objects.all().delete()
+    PricingProfile.objects.all().delete()
+
+
+@override_settings(PRICING_STAMP_TTL=0)
+def test_most_specific_active_profile_wins(profiles):
+    fallback = PricingProfile.objects.create(name="Default")
+    uk = PricingProfile.objects.create(name="UK", country_code=" gb ")
+    uk_qsr = PricingProfile.objects.create(name="UK QSR", country_code="GB", business_type="QSR")
+    qsr = PricingProfile.objects.create(name="QSR", business_type="QSR")
+    PricingProfile.objects.create(name="Off", country_code="US", is_active=False)
+
+    cache = PricingCache()
+    assert cache.resolve("gb", "QSR") == uk_qsr
+    assert cache.resolve("GB", "Full Service") == uk
+    assert cache.resolve("US", "QSR") == qsr
+    assert cache.resolve("US", "Full Service") == fallback
+    assert cache.resolve(None, None) == fallback
+
+
+def test_edits_reach_the_cache_once_the_stamp_changes(profiles):
+    cache = PricingCache()
+    with override_settings(PRICING_STAMP_TTL=3600):
+        assert cache.resolve("GB") is None
+        profile = PricingProfile.objects.create(name="UK", country_code="GB", applova_commission_rate=0.08)
+        # Within the TTL the previous snapshot is served without a query.
+        assert cache.resolve("GB") is None
+
+    with override_settings(PRICING_STAMP_TTL=0):
+        assert cache.resolve("GB").applova_commission_rate == 0.08
+        profile.applova_commission_rate = 0.07
+        profile.save()
+        cached = cache.resolve("GB")
+        assert (cached.applova_commission_rate, cached.version) == (0.07, 2)
+        profile.delete()
+        assert cache.resolve("GB") is None
+
+
+def test_profile_rates_drive_the_calculation():
+    profile = PricingProfile(name="Cheap", applova_commission_rate=0.05, ltv_uplift_factor=0.2,
+                             recovery_efficiency=1.0)
+    default = calculate_profit_gain(30, 500, 28, 120)
+    custom = calculate_profit_gain(30, 500, 28, 120, profile=profile)
+
+    revenue = 30 * 500 * 12
+    assert custom["commission_fee_savings"] == pytest.approx((0.28 - 0.05) * revenue)
+    assert custom["lclv_gain"] == pytest.approx(0.2 * revenue)
+    assert custom["total_profit_gain_potential"] != default["total_profit_gain_potential"]
+    assert pricing_rates(profile) == {
+        "applova_commission_rate": 0.05, "ltv_uplift_factor": 0.2, "recovery_efficiency": 1.0,
+    }
+
+
+@override_settings(PRICING_STAMP_TTL=0, EVENT_LOG_SINK='file')
+def test_market_comes_from_the_stored_lead_not_the_client(profiles, monkeypatch, tmp_path):
+    monkeypatch.setattr(StateMachine, 'domain_accepts_mail', staticmethod(lambda domain: True))
+    monkeypatch.setattr('advisor.views.enqueue_report', lambda result, email=None: None)
+    uk = PricingProfile.objects.create(name="UK", country_code="GB", applova_commission_rate=0.08)
+    PricingProfile.objects.create(name="US", country_code="US", applova_commission_rate=0.15)
+    pricing.cache.refresh(force=True)
+    lead = Lead.objects.create(business_type="QSR", country_code="GB")
+
+    request = RequestFactory().post('/api/chat/', {
+        'current_state': 'email',
+        'user_input': 'owner@restaurant-example.com',
+        'data': dict(ANSWERS, lead_id=lead.id, country_code='US'),
+    }, content_type='application/json')
+    with override_settings(EVENT_LOG_PATH=str(tmp_path / 'events.jsonl')):
+        response = ChatView.as_view()(request)
+
+    payload = response.data['result']['crm_payload']
+    assert payload['pricing_profile_id'] == uk.id
+    lead.refresh_from_db()
+    assert (lead.pricing_profile_id, lead.pricing_profile_version) == (uk.id, 1)
+    assert lead.pricing_rates["applova_commission_rate"] == 0.08
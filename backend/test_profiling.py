@@ -0,0 +1,60 @@
+import os
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from advisor.models import ProfilerSettings, RequestProfile
+from advisor.profiling import ProfilingMiddleware
+
+factory = RequestFactory()
+OFF = dict(PROFILING_SAMPLE_RATE=0, PROFILING_SETTINGS_TTL=3600)
+
+
+def middleware():
+    m = ProfilingMiddleware(lambda request: HttpResponse('ok'))
+    # Don't read the admin toggle unless a test asks for it.
+    m._toggle_checked_at = float('inf')
+    return m
+
+
+@override_settings(PROFILING_TOKEN='', DEBUG=True, **OFF)
+def test_header_is_ignored_without_a_token():
+    request = factory.get('/api/chat/', HTTP_X_PROFILE='1')
+    assert middleware().trigger_for(request) is None
+
+
+@override_settings(PROFILING_TOKEN='s3cret', **OFF)
+def test_header_needs_the_configured_token():
+    m = middleware()
+    assert m.trigger_for(factory.get('/api/chat/', HTTP_X_PROFILE='guess')) is None
+    assert m.trigger_for(factory.get('/api/chat/', HTTP_X_PROFILE='s3cret')) == 'header'
+    assert m.trigger_for(factory.get('/admin/', HTTP_X_PROFILE='s3cret')) is None
+
+
+@override_settings(PROFILING_TOKEN='', PROFILING_SAMPLE_RATE=0, PROFILING_SETTINGS_TTL=0)
+def test_admin_toggle_enables_sampling(migrated_db):
+    ProfilerSettings.objects.create(enabled=True, sample_rate=1.0)
+    try:
+        m = ProfilingMiddleware(lambda request: HttpResponse('ok'))
+        assert m.trigger_for(factory.get('/api/chat/')) == 'admin'
+    finally:
+        ProfilerSettings.objects.all().delete()
+
+
+@override_settings(PROFILING_TOKEN='s3cret', PROFILING_MAX_PROFILES=3, PROFILING_INTERVAL_MS=1, **OFF)
+def test_profiles_are_saved_and_capped(migrated_db):
+    m = middleware()
+    for _ in range(5):
+        request = factory.post('/api/chat/', {'current_state': 'aov'}, content_type='application/json',
+                               HTTP_X_PROFILE='s3cret')
+        assert m(request).content == b'ok'
+
+    profiles = list(RequestProfile.objects.order_by('id'))
+    assert len(profiles) == 3
+    assert profiles[-1].state == 'aov'
+    assert profiles[-1].trigger == 'header'
+    RequestProfile.objects.all().delete()
@@ -0,0 +1,86 @@
+import os
+from datetime import timedelta
+from io import StringIO
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from advisor.models import ArchivedLead, Lead, PricingProfile
+
+
+@pytest.fixture
+def leads(migrated_db):
+    yield
+    Lead.objects.all().delete()
+    ArchivedLead.objects.all().delete()
+    PricingProfile.objects.all().delete()
+
+
+def make_lead(days_old, **fields):
+    lead = Lead.objects.create(**fields)
+    Lead.objects.filter(id=lead.id).update(created_at=timezone.now() - timedelta(days=days_old))
+    return Lead.objects.get(id=lead.id)
+
+
+def prune(*args):
+    call_command('prune_leads', '--abandoned-days=30', '--completed-days=365', *args, stdout=StringIO())
+
+
+def test_archives_old_leads_and_keeps_recent_ones(leads):
+    old_partial = make_lead(40, business_type="QSR")
+    old_completed = make_lead(400, is_completed=True, email="a@example.com")
+    recent_partial = make_lead(5)
+    recent_completed = make_lead(100, is_completed=True)
+
+    prune()
+
+    assert set(Lead.objects.values_list('id', flat=True)) == {recent_partial.id, recent_completed.id}
+    assert set(ArchivedLead.objects.values_list('original_id', flat=True)) == {old_partial.id, old_completed.id}
+
+
+def test_delete_abandoned_skips_the_archive(leads):
+    old_partial = make_lead(40)
+    old_completed = make_lead(400, is_completed=True)
+
+    prune('--delete-abandoned')
+
+    assert not Lead.objects.exists()
+    assert list(ArchivedLead.objects.values_list('original_id', flat=True)) == [old_completed.id]
+    assert not ArchivedLead.objects.filter(original_id=old_partial.id).exists()
+
+
+def test_max_batches_limits_each_run(leads):
+    for _ in range(5):
+        make_lead(40)
+
+    prune('--batch-size=2', '--max-batches=1')
+    assert Lead.objects.count() == 3
+    prune('--batch-size=2', '--max-batches=1')
+    assert Lead.objects.count() == 1
+    prune('--batch-size=2')
+    assert ArchivedLead.objects.count() == 5
+
+
+def test_every_field_survives_archiving(leads):
+    profile = PricingProfile.objects.create(name="UK", country_code="GB")
+    lead = make_lead(
+        400, is_completed=True, lead_source="Test", business_type="QSR", third_party_apps=["DoorDash"],
+        email="owner@example.com", email_unverified=True, aov=30.5, monthly_orders=500, commission_rate=28.0,
+        monthly_fixed_fee=120.0, calculated_annual_leak=1000.0, estimated_recovery=900.0,
+        lead_score_tag="L-Score: Low", pricing_profile=profile, pricing_profile_version=1,
+        pricing_rates={"applova_commission_rate": 0.1}, ip_address="203.0.113.7", city="London",
+        region="England", country="United Kingdom", country_code="GB", consultation_requested=True,
+    )
+
+    prune()
+
+    archived = ArchivedLead.objects.get(original_id=lead.id)
+    for field in Lead._meta.concrete_fields:
+        if field.name not in ArchivedLead.NOT_ARCHIVED:
+            assert getattr(archived, field.attname) == getattr(lead, field.attname), field.name
@@ -0,0 +1,58 @@
+import os
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from django.core import mail
+from django.test import override_settings
+
+from advisor import reports
+from advisor.state_machine import StateMachine
+
+
+def completed_result():
+    sm = StateMachine(current_state="email", data={
+        "business_type": "QSR", "aov": 30.0, "orders": 500, "commission": 28.0,
+        "monthly_fixed_fee": 120.0, "third_party_apps": ["DoorDash"],
+    })
+    # Skip the DNS-backed email validation; only the result payload matters here.
+    sm.STATES = dict(StateMachine.STATES, email=dict(StateMachine.STATES["email"], validation=lambda x: True))
+    return sm.process_input("owner@example.com")["result"]
+
+
+def test_report_is_rendered_in_background_cached_and_emailed(tmp_path):
+    with override_settings(REPORT_CACHE_DIR=str(tmp_path),
+                           EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+        result = completed_result()
+        report_id = reports.enqueue_report(result, email="owner@example.com")
+        reports.worker.join()
+
+        html_path = reports.report_path(report_id)
+        assert os.path.exists(html_path)
+        with open(html_path) as f:
+            assert result["formatted_recovery"] in f.read()
+        assert mail.outbox[-1].to == ["owner@example.com"]
+        # WeasyPrint isn't installed here: nothing attached, and the text says so.
+        assert mail.outbox[-1].attachments == []
+        assert "attached" not in mail.outbox[-1].body
+
+        # Same numbers from another lead hit the same cached report.
+        mtime = os.path.getmtime(html_path)
+        result["crm_payload"]["email"] = "other@example.com"
+        result["crm_payload"]["lead_id"] = 42
+        assert reports.enqueue_report(result) == report_id
+        reports.worker.join()
+        assert os.path.getmtime(html_path) == mtime
+
+
+def test_pdf_is_attached_when_rendered(tmp_path, monkeypatch):
+    monkeypatch.setattr(reports, "render_pdf", lambda html: b"%PDF-stub")
+    with override_settings(REPORT_CACHE_DIR=str(tmp_path),
+                           EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+        reports.enqueue_report(completed_result(), email="pdf@example.com")
+        reports.worker.join()
+        message = mail.outbox[-1]
+        assert message.to == ["pdf@example.com"]
+        assert message.attachments[0][0] == "profit-recovery-report.pdf"
+        assert "attached" in message.body
@@ -0,0 +1,172 @@
+import os
+import time
+from io import StringIO
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+import dns.resolver
+import pytest
+from django.core.management import call_command
+from django.conf import settings
+from django.test import override_settings
+
+from advisor import resilience
+from advisor.models import Lead
+from advisor.resilience import CircuitBreaker, CircuitOpen, DeadlineExceeded
+from advisor.state_machine import StateMachine
+
+FAST_BUDGETS = dict(
+    dns={'timeout': 0.05, 'hedge_after': 0.01, 'failure_threshold': 2, 'reset_timeout': 60.0},
+    ip_geolocation={'timeout': 0.05, 'failure_threshold': 2, 'reset_timeout': 60.0},
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def slow(seconds, value=True):
+    """Fault-injecting stub: a dependency that hangs for ``seconds``."""
+    def fn(*args, **kwargs):
+        time.sleep(seconds)
+        return value
+    return fn
+
+
+def failing(*args, **kwargs):
+    raise ConnectionError("provider down")
+
+
+ANSWERS = {
+    "business_type": "QSR", "aov": 30.0, "orders": 500, "commission": 28.0,
+    "monthly_fixed_fee": 120.0, "third_party_apps": ["DoorDash"],
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    resilience.reset_breakers()
+    StateMachine._mail_domain_verdicts.clear()
+    with override_settings(RESILIENCE=FAST_BUDGETS):
+        yield
+    resilience.reset_breakers()
+    StateMachine._mail_domain_verdicts.clear()
+
+
+def test_breaker_opens_then_half_opens_after_reset_timeout():
+    clock = Clock()
+    breaker = CircuitBreaker('stub', failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()       # single trial call
+    assert not breaker.allow()   # others still fail fast
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_call_enforces_budget_and_fails_fast_once_open():
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        resilience.call('ip_geolocation', slow(0.5))
+    assert time.monotonic() - started < 0.2
+
+    with pytest.raises(ConnectionError):
+        resilience.call('ip_geolocation', failing)
+    with pytest.raises(CircuitOpen):
+        resilience.call('ip_geolocation', slow(0))
+
+
+def test_hedge_wins_when_primary_hangs():
+    assert resilience.call('dns', slow(0.5, 'primary'), hedge=slow(0, 'hedge')) == 'hedge'
+
+
+def test_email_accepted_and_flagged_when_dns_is_down(monkeypatch):
+    monkeypatch.setattr(StateMachine, 'lookup_mail_records', staticmethod(slow(0.5)))
+    started = time.monotonic()
+    result = StateMachine(current_state='email', data=dict(ANSWERS)).process_input('owner@restaurant-example.com')
+    assert time.monotonic() - started < 0.2
+    assert result['valid'] is True
+    assert result['data']['email_unverified'] is True
+
+
+def test_email_rejected_when_policy_is_closed(monkeypatch):
+    monkeypatch.setattr(StateMachine, 'lookup_mail_records', staticmethod(failing))
+    with override_settings(EMAIL_DNS_FAILURE_POLICY='closed'):
+        result = StateMachine(current_state='email', data=dict(ANSWERS)).process_input('owner@restaurant-example.com')
+    assert result['valid'] is False
+
+
+def run_in_child(fn):
+    """Fork, run ``fn`` in the child and return its exit status (0 on success)."""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            code = 0 if fn() else 1
+        except BaseException:
+            code = 2
+        os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+def test_forked_worker_gets_its_own_pool_and_breakers():
+    # As in the gunicorn master with preload_app: calls (and an opened breaker)
+    # before the fork.
+    assert resilience.call('dns', slow(0, 'ok')) == 'ok'
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            resilience.call('ip_geolocation', failing)
+
+    def child():
+        return (resilience.call('dns', slow(0, 'ok')) == 'ok'
+                and resilience.call('ip_geolocation', slow(0, 'ok')) == 'ok')
+
+    assert run_in_child(child) == 0
+
+
+def test_reverify_settles_leads_and_keeps_the_queue_moving(migrated_db, monkeypatch):
+    verdicts = {'good.example': True, 'bad.example': False, 'down.example': None}
+    monkeypatch.setattr(StateMachine, 'domain_accepts_mail', staticmethod(verdicts.get))
+    bad = [Lead.objects.create(email=f'owner{i}@bad.example', email_unverified=True) for i in range(2)]
+    good = Lead.objects.create(email='owner@good.example', email_unverified=True)
+    down = Lead.objects.create(email='owner@down.example', email_unverified=True)
+
+    try:
+        for _ in range(3):
+            call_command('reverify_emails', '--limit=2', stdout=StringIO())
+
+        flags = dict((lead.id, (lead.email_unverified, lead.email_undeliverable)) for lead in Lead.objects.all())
+        assert [flags[lead.id] for lead in bad] == [(False, True), (False, True)]
+        assert flags[good.id] == (False, False)
+        assert flags[down.id] == (True, False)
+    finally:
+        Lead.objects.all().delete()
+
+
+def test_servfail_counts_as_an_outage_not_an_invalid_domain(monkeypatch):
+    def servfail(*args, **kwargs):
+        raise dns.resolver.NoNameservers()
+
+    monkeypatch.setattr(dns.resolver, 'resolve', servfail)
+    with override_settings(DNS_HEDGE_NAMESERVERS=[]):
+        assert StateMachine.validate_email_input('owner@restaurant-example.com') is True
+        assert StateMachine.email_unverified('owner@restaurant-example.com') is True
+        assert resilience.get_breaker('dns').failures == 1
+        verdict, expires_at = StateMachine._mail_domain_verdicts['restaurant-example.com']
+        assert verdict is None
+        assert expires_at - time.monotonic() <= settings.DNS_UNKNOWN_VERDICT_TTL
+
+        with override_settings(EMAIL_DNS_FAILURE_POLICY='closed'):
+            StateMachine._mail_domain_verdicts.clear()
+            assert StateMachine.validate_email_input('owner@restaurant-example.com') is False